@@ -0,0 +1,239 @@
+"""
+batch_runner.py
+
+Runs many rate_test configs in one process, loading shared inputs once.
+
+Configs usually differ in their price file and output path but share the
+ccy rules and the spot history. The runner works out which inputs the jobs
+share (same file, type, read_args, columns, timestamp format and dtypes),
+loads every distinct source once and builds one sorted SpotRateIndex per
+distinct spot source, which every job using it reuses. Spot rates are read
+for the union of the jobs' price ranges plus the spot lookback.
+
+Every job is converted in memory with the PriceConverter steps; the jobs'
+execution settings (mode, workers, backend) are not used. With --workers
+above 1 jobs run on a forked process pool, which inherits the loaded
+frames and indexes instead of copying them. A job failing during its
+conversion is reported and does not stop the others; input errors stop
+the batch before any job runs.
+
+Command line, run from the rate_test directory:
+    python scripts/batch_runner.py configs/desk_a.json configs/desk_b.json --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+# Add project root to sys.path
+current_file = Path(__file__).resolve()
+project_root = current_file.parent.parent
+sys.path.insert(0, str(project_root))
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(project_root.parent))
+
+from scripts.config import Config
+from scripts.load_data import DataLoader
+from scripts.price_converter import PriceConverter
+from scripts.spot_index import SpotRateIndex
+
+# Job inputs of the current run; forked workers inherit them
+_jobs: List[dict] = []
+
+def _run_job(index: int) -> Dict:
+    """
+    Convert one job with its shared inputs and write its output.
+
+    Args:
+        index (int): Position of the job in _jobs.
+
+    Returns:
+        dict: Summary record of the job.
+    """
+    job = _jobs[index]
+    config = job["config"]
+    record = {"config": str(job["path"]), "output": str(config.output.path), "status": "ok"}
+    start = time.perf_counter()
+    try:
+        converter = PriceConverter(config, job["ccy_df"], job["price_df"], job["spot_df"],
+                                   spot_index=job["spot_index"])
+        converter.merge_conversion_info()
+        converter.match_spot_rates()
+        converter.calculate_new_prices()
+        converter.export_results()
+
+        statuses = converter.price_df["conversion_status"].value_counts()
+        record["rows"] = len(converter.price_df)
+        record.update({status: int(count) for status, count in statuses.items()})
+    except Exception as exc:
+        record.update({"status": "failed", "error": f"{type(exc).__name__}: {exc}",
+                       "traceback": traceback.format_exc()})
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+class BatchRunner:
+    """
+    Loads the distinct inputs of a list of configs once and runs every config as a job.
+
+    Args:
+        config_paths (list[Path]): config.json files, one per job.
+        workers (int): Jobs run concurrently; 1 runs them one after another.
+    """
+
+    def __init__(self, config_paths: List[Path], workers: int = 1):
+        self.config_paths = [Path(p) for p in config_paths]
+        self.configs = [Config(p) for p in self.config_paths]
+        self.workers = workers
+        self.loads: List[dict] = []
+
+        outputs = [config.output.path.resolve() for config in self.configs]
+        duplicates = {str(path) for path in outputs if outputs.count(path) > 1}
+        if duplicates:
+            raise ValueError(f"Several configs write the same output file: {sorted(duplicates)}")
+
+    @staticmethod
+    def source_key(config: Config, cfg_data, columns: List[str]) -> Tuple:
+        """
+        Identity of a loaded input: jobs with equal keys get the same frame.
+        """
+        dtypes = config.dtypes
+        return (
+            str(cfg_data.path.resolve()),
+            cfg_data.type,
+            json.dumps(cfg_data.read_args, sort_keys=True),
+            tuple(columns),
+            config.timestamp_format,
+            dtypes.compact,
+            dtypes.float32_prices,
+        )
+
+    def _timed_load(self, kind: str, key: Tuple, load) -> pd.DataFrame:
+        """Run one load and record it in self.loads."""
+        start = time.perf_counter()
+        df = load()
+        self.loads.append({"input": kind, "file": key[0], "rows": len(df), "seconds": time.perf_counter() - start})
+        return df
+
+    def load(self) -> List[dict]:
+        """
+        Load every distinct input once and build one spot index per spot source.
+
+        Returns:
+            list[dict]: Per job: path, config and the shared ccy, price and spot
+                frames and spot index.
+        """
+        jobs = []
+        ccy_frames, price_frames = {}, {}
+        for path, config in zip(self.config_paths, self.configs):
+            loader = DataLoader(config)
+            col = config.columns
+            ccy_key = self.source_key(config, config.ccy, [])
+            price_key = self.source_key(config, config.price, loader._price_cols())
+            if ccy_key not in ccy_frames:
+                ccy_frames[ccy_key] = self._timed_load("ccy", ccy_key, loader.load_ccy)
+            if price_key not in price_frames:
+                price_frames[price_key] = self._timed_load("price", price_key, loader.load_prices)
+
+            price_df = price_frames[price_key]
+            jobs.append({
+                "path": path,
+                "config": config,
+                "loader": loader,
+                "ccy_df": ccy_frames[ccy_key],
+                "price_df": price_df,
+                "spot_key": self.source_key(config, config.spot, loader._spot_cols()),
+                "price_range": (price_df[col.timestamp].min(), price_df[col.timestamp].max()),
+            })
+
+        # One spot read per source, covering the price ranges of all jobs using it
+        spot_frames, spot_indexes = {}, {}
+        for job in jobs:
+            key = job["spot_key"]
+            if key in spot_frames:
+                continue
+            ranges = [j["price_range"] for j in jobs if j["spot_key"] == key]
+            loader = job["loader"]
+            time_range = loader._spot_range(min(r[0] for r in ranges), max(r[1] for r in ranges))
+            spot_frames[key] = self._timed_load("spot", key, lambda: loader.load_spot(time_range))
+            spot_indexes[key] = SpotRateIndex(spot_frames[key], job["config"].columns)
+
+        for job in jobs:
+            job["spot_df"] = spot_frames[job["spot_key"]]
+            job["spot_index"] = spot_indexes[job["spot_key"]]
+        return jobs
+
+    def run(self) -> Dict:
+        """
+        Load the shared inputs and run every job.
+
+        Returns:
+            dict: Report with the loads, one record per job and the totals.
+        """
+        global _jobs
+        start = time.perf_counter()
+        _jobs = self.load()
+        load_seconds = time.perf_counter() - start
+
+        try:
+            if self.workers > 1 and len(_jobs) > 1:
+                with self._executor() as pool:
+                    records = list(pool.map(_run_job, range(len(_jobs))))
+            else:
+                records = [_run_job(i) for i in range(len(_jobs))]
+        finally:
+            _jobs = []
+
+        return {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "jobs": len(records),
+            "failed": sum(record["status"] != "ok" for record in records),
+            "load_seconds": load_seconds,
+            "total_seconds": time.perf_counter() - start,
+            "loads": self.loads,
+            "results": records,
+        }
+
+    def _executor(self):
+        """Forked process pool where available (workers inherit the inputs), else threads."""
+        workers = min(self.workers, len(_jobs))
+        if "fork" in multiprocessing.get_all_start_methods():
+            return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+        return ThreadPoolExecutor(max_workers=workers)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several rate_test configs, loading shared inputs once.")
+    parser.add_argument("configs", nargs="+", type=Path, help="config.json files, one per job.")
+    parser.add_argument("--workers", type=int, default=1, help="Jobs run concurrently.")
+    parser.add_argument("--report", type=Path, default=None, help="Write the summary report as JSON.")
+    args = parser.parse_args()
+
+    report = BatchRunner(args.configs, workers=args.workers).run()
+
+    print(pd.DataFrame(report["loads"]).to_string(index=False))
+    columns = ["config", "status", "rows", "conversion_done", "conversion_failed_no_spot_rate", "seconds"]
+    results = pd.DataFrame(report["results"]).reindex(columns=columns)
+    print(results.to_string(index=False))
+    for record in report["results"]:
+        if record["status"] != "ok":
+            print(f"{record['config']} failed:\n{record['traceback']}", file=sys.stderr)
+    print(f"{report['jobs']} jobs, {report['failed']} failed, {report['total_seconds']:.2f} s "
+          f"({report['load_seconds']:.2f} s loading)")
+
+    if args.report is not None:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Report written to {args.report}")
+    sys.exit(1 if report["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+benchmark.py
+
+Scaling benchmark for the FX price conversion pipeline.
+
+For every requested size, synthetic input data is generated with
+RateDataGenerator and the PriceConverter stages are timed one by one:
+load, merge_conversion_info, match_spot_rates, calculate_new_prices and
+export_results. Each size runs in a fresh process, so the reported peak
+RSS belongs to that size only.
+
+Results are written as JSON by shared/benchmark.py (one record per size
+and stage, with seconds, rows per second and peak RSS), together with the
+git commit and package versions, so runs can be compared across versions.
+
+Run from the rate_test directory:
+    python scripts/benchmark.py --sizes 10000 100000 1000000
+    python scripts/benchmark.py --sizes 1000000 --low-memory   # peak RSS of execution.low_memory
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to sys.path
+current_file = Path(__file__).resolve()
+project_root = current_file.parent.parent
+sys.path.insert(0, str(project_root))
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(project_root.parent))
+
+from scripts.config import Config
+from scripts.load_data import DataLoader
+from scripts.price_converter import PriceConverter
+from scripts.synthetic_data import RateDataGenerator
+from shared.benchmark import DEFAULT_SIZES, Benchmark, timed_stage, total_record, write_report
+
+def _run_pipeline(config_path: Path, rows: int) -> List[dict]:
+    """
+    Worker entry point: run and time every PriceConverter stage once.
+
+    Returns:
+        list[dict]: One record per stage.
+    """
+    records = []
+    config = Config(config_path)
+
+    with timed_stage(records, "load", rows):
+        ccy_df, price_df, spot_df = DataLoader(config).load_all()
+
+    converter = PriceConverter(config, ccy_df, price_df, spot_df)
+    with timed_stage(records, "merge_conversion_info", rows):
+        converter.merge_conversion_info()
+    with timed_stage(records, "match_spot_rates", rows):
+        converter.match_spot_rates()
+    with timed_stage(records, "calculate_new_prices", rows):
+        converter.calculate_new_prices()
+    with timed_stage(records, "export_results", rows):
+        converter.export_results()
+
+    records.append(total_record(records, rows))
+    return records
+
+class RateBenchmark(Benchmark):
+    """
+    Generates data for each size and times the pipeline on it.
+
+    Args:
+        config_path (Path): Project config.json; its settings (dtypes,
+            timestamp format, columns, output type) are reused, only the
+            data and output paths are replaced.
+        work_dir (Path): Directory for generated data and outputs.
+        pairs (int): Number of ccy_pairs in the generated data.
+        gap_frequency (float): Share of pair-hours without spot rates.
+        spot_ratio (float): Spot rows per price row.
+        seed (int): Random seed for the generator.
+        low_memory (bool, optional): Override execution.low_memory of the config.
+    """
+
+    project = "rate_test"
+    pipeline = _run_pipeline
+
+    def __init__(self, config_path: Path, work_dir: Path, pairs: int = 50,
+                 gap_frequency: float = 0.05, spot_ratio: float = 1.0, seed: int = 0,
+                 low_memory: bool = None):
+        super().__init__(config_path, work_dir)
+        self.pairs = pairs
+        self.gap_frequency = gap_frequency
+        self.spot_ratio = spot_ratio
+        self.seed = seed
+        self.low_memory = low_memory
+
+    def prepare(self, rows: int, regenerate: bool = False) -> Path:
+        size_dir = self.work_dir / f"rows_{rows}"
+        data_dir = size_dir / "data"
+        if regenerate or not data_dir.exists():
+            generator = RateDataGenerator(rows, pairs=self.pairs, spot_rows=int(rows * self.spot_ratio),
+                                          gap_frequency=self.gap_frequency, seed=self.seed)
+            generator.write(data_dir)
+
+        with open(self.config_path) as f:
+            config = json.load(f)
+        config["data"]["ccy_file"] = {"path": "data/rates_ccy_data.csv", "type": "csv"}
+        config["data"]["price_file"] = {"path": "data/rates_price_data.parq.gzip", "type": "parquet"}
+        config["data"]["spot_file"] = {"path": "data/rates_spot_rate_data.parq.gzip", "type": "parquet"}
+        config["output_file"]["path"] = Path(config["output_file"]["path"]).name
+        # Time the real parsing work, not parsed-input cache hits
+        config["cache"] = {"enabled": False}
+        if self.low_memory is not None:
+            config.setdefault("execution", {})["low_memory"] = self.low_memory
+
+        config_path = size_dir / "config.json"
+        with open(config_path, "w") as f:
+            json.dump(config, f, indent=2)
+        return config_path
+
+    def params(self) -> Dict:
+        return {"pairs": self.pairs, "gap_frequency": self.gap_frequency,
+                "spot_ratio": self.spot_ratio, "seed": self.seed, "low_memory": self.low_memory}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rate_test pipeline on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Price row counts.")
+    parser.add_argument("--pairs", type=int, default=50, help="Number of ccy_pairs.")
+    parser.add_argument("--gap-frequency", type=float, default=0.05, help="Share of pair-hours without spot rates.")
+    parser.add_argument("--spot-ratio", type=float, default=1.0, help="Spot rows per price row.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", type=Path, default=Path("config.json"))
+    parser.add_argument("--work-dir", type=Path, default=Path("benchmark"))
+    parser.add_argument("--output", type=Path, default=None, help="Results file (default: <work-dir>/results.json).")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate data that already exists.")
+    parser.add_argument("--low-memory", action=argparse.BooleanOptionalAction, default=None,
+                        help="Run with execution.low_memory on or off (default: as in the config).")
+    args = parser.parse_args()
+
+    benchmark = RateBenchmark(args.config, args.work_dir, pairs=args.pairs, gap_frequency=args.gap_frequency,
+                              spot_ratio=args.spot_ratio, seed=args.seed, low_memory=args.low_memory)
+    report = benchmark.run(args.sizes, regenerate=args.regenerate)
+    write_report(report, args.output or args.work_dir / "results.json")
+
+if __name__ == "__main__":
+    main()
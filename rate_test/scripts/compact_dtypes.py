@@ -0,0 +1,36 @@
+"""
+compact_dtypes.py
+
+conversion_status enum of the FX price conversion pipeline.
+
+When dtypes.compact is enabled in config.json, conversion_status becomes an
+int8-coded categorical enum instead of object strings. The categorical
+identifier columns and float32 prices of the compact schema are handled by
+shared/compact_dtypes.py.
+"""
+
+import numpy as np
+import pandas as pd
+
+# conversion_status values, in code order (the codes fit in int8)
+CONVERSION_STATUSES = [
+    "no_conversion_required",
+    "conversion_done",
+    "conversion_failed_no_spot_rate",
+]
+CONVERSION_STATUS_DTYPE = pd.CategoricalDtype(CONVERSION_STATUSES)
+
+def conversion_status(codes: np.ndarray, compact: bool) -> pd.Categorical:
+    """
+    Build the conversion_status column from int8 status codes.
+
+    Args:
+        codes (np.ndarray): Indices into CONVERSION_STATUSES.
+        compact (bool): Return the categorical enum instead of object strings.
+
+    Returns:
+        pd.Categorical | np.ndarray: conversion_status values.
+    """
+    if compact:
+        return pd.Categorical.from_codes(codes, dtype=CONVERSION_STATUS_DTYPE)
+    return np.asarray(CONVERSION_STATUSES, dtype=object)[codes]
@@ -14,6 +14,13 @@ class Config:
         price (ConfigData): Configuration for the price data file.
         spot (ConfigData): Configuration for the spot rate data file.
         output (ConfigData): Configuration for the output file.
+        execution (ExecutionConfig): How the conversion is run (in memory or chunked).
+        live (LiveConfig): Settings for the live tick conversion service.
+        dtypes (DtypeConfig): In-memory schema of the loaded frames.
+        metrics (MetricsConfig): Stage-level instrumentation settings.
+        cache (CacheConfig): Parsed-input cache settings.
+        incremental (IncrementalConfig): Watermark and output layout of incremental runs.
+        spot_store (SpotStoreConfig): Partitioned on-disk spot rate store settings.
     """
     def __init__(self, config_path: Path):
         config_path = config_path.resolve()
@@ -28,6 +35,13 @@ class Config:
         self.output = ConfigData(config["output_file"], base_dir)
         self.timestamp_format = config.get("timestamp_format", "%Y-%m-%d %H:%M:%S.%f")
         self.columns = ColumnConfig(config.get("columns", {}))
+        self.execution = ExecutionConfig(config.get("execution", {}))
+        self.live = LiveConfig(config.get("live", {}))
+        self.dtypes = DtypeConfig(config.get("dtypes", {}))
+        self.metrics = MetricsConfig(config.get("metrics", {}), base_dir)
+        self.cache = CacheConfig(config.get("cache", {}), base_dir)
+        self.incremental = IncrementalConfig(config.get("incremental", {}), base_dir)
+        self.spot_store = SpotStoreConfig(config.get("spot_store", {}), base_dir)
 
 class ConfigData:
     """
@@ -40,7 +54,12 @@ class ConfigData:
     Attributes:
         path (Path): Absolute path to the file.
         type (str): File type, e.g., 'csv' or 'parquet'.
-        read_args (dict): Optional arguments passed to pandas when reading the file.
+        read_args (dict): Optional arguments passed to pandas when reading the file
+            (and to to_csv for csv output).
+        write_args (dict): Optional output settings (compression, row_group_size, ...).
+        drop_columns (list): Helper columns left out of the output file.
+        engine (str): CSV reader for input files: 'pandas', or 'arrow' for the
+            multi-threaded pyarrow reader (see DataLoader).
 
     Returns:
         ConfigData: A configuration wrapper for a single file.
@@ -49,6 +68,11 @@ class ConfigData:
         self.path = base_dir / cfg["path"]
         self.type = cfg["type"]
         self.read_args = cfg.get("read_args", {})
+        self.write_args = cfg.get("write_args", {})
+        self.drop_columns = cfg.get("drop_columns", [])
+        self.engine = cfg.get("engine", "pandas")
+        if self.engine not in ("pandas", "arrow"):
+            raise ValueError(f"Unsupported CSV engine: {self.engine}")
 
     def __repr__(self):
         """
@@ -67,3 +91,158 @@ class ColumnConfig:
         self.spot_rate = cfg.get("spot_rate", "spot_mid_rate")
         self.conversion_factor = cfg.get("conversion_factor", "conversion_factor")
         self.convert_price = cfg.get("convert_price", "convert_price")
+
+class ExecutionConfig:
+    """
+    Execution settings for the conversion pipeline.
+
+    Args:
+        cfg (dict): Dictionary with the optional keys listed below.
+
+    Attributes:
+        mode (str): 'in_memory' loads all prices at once, 'chunked' streams
+            the price file in batches of chunk_size rows, 'incremental'
+            converts only the prices newer than the saved watermark.
+        chunk_size (int): Number of price rows per batch in chunked mode.
+        workers (int): Worker processes for the in-memory conversion; 1 runs serially.
+        partition_by (str): 'ccy_pair' or 'ccy_pair_day' partitioning for parallel runs.
+        hot_pair_min_rows (int): With 'ccy_pair', pairs with at least this many
+            price rows are also split by day.
+        backend (str): 'pandas', or 'polars' to run the in-memory conversion as a
+            lazy, multi-threaded polars query (see scripts/polars_backend.py).
+        low_memory (bool): Convert without copying the price frame: conversion
+            rules are looked up by ccy_pair position instead of merged, and
+            new_price is one vectorized expression (see PriceConverter).
+        spot_per_chunk (bool): In chunked mode, load each price batch's spot
+            range instead of the whole spot history (see ChunkedPriceConverter).
+    """
+    def __init__(self, cfg: dict):
+        self.mode = cfg.get("mode", "in_memory")
+        self.chunk_size = cfg.get("chunk_size", 500_000)
+        self.workers = cfg.get("workers", 1)
+        self.partition_by = cfg.get("partition_by", "ccy_pair")
+        self.hot_pair_min_rows = cfg.get("hot_pair_min_rows", 1_000_000)
+        self.backend = cfg.get("backend", "pandas")
+        self.low_memory = cfg.get("low_memory", False)
+        self.spot_per_chunk = cfg.get("spot_per_chunk", False)
+        if self.backend not in ("pandas", "polars"):
+            raise ValueError(f"Unsupported backend: {self.backend}")
+
+class LiveConfig:
+    """
+    Settings for the asyncio live tick conversion service.
+
+    Args:
+        cfg (dict): Dictionary with the optional keys listed below.
+
+    Attributes:
+        source (str): 'stdin' to read NDJSON from standard input, 'socket' to
+            accept NDJSON connections on host:port.
+        host (str): Interface the socket server binds to.
+        port (int): Port the socket server listens on.
+        max_batch_size (int): Maximum number of price ticks converted together.
+        max_latency_ms (float): Maximum time a tick waits for its micro-batch to fill.
+        tolerance (str): Maximum age of a spot rate used for conversion.
+        stats_interval_s (float): Seconds between latency reports on stderr (0 disables).
+    """
+    def __init__(self, cfg: dict):
+        self.source = cfg.get("source", "stdin")
+        self.host = cfg.get("host", "127.0.0.1")
+        self.port = cfg.get("port", 8765)
+        self.max_batch_size = cfg.get("max_batch_size", 1000)
+        self.max_latency_ms = cfg.get("max_latency_ms", 50)
+        self.tolerance = cfg.get("tolerance", "1h")
+        self.stats_interval_s = cfg.get("stats_interval_s", 10)
+
+class DtypeConfig:
+    """
+    In-memory schema settings for the loaded frames.
+
+    Args:
+        cfg (dict): Dictionary with optional 'compact', 'float32_prices' and 'memory_report'.
+
+    Attributes:
+        compact (bool): Store ccy_pair and conversion_status as categoricals
+            (conversion_status as an int8-coded enum) instead of object strings.
+        float32_prices (bool): Store price as float32.
+        memory_report (bool): Print the memory usage of each frame.
+    """
+    def __init__(self, cfg: dict):
+        self.compact = cfg.get("compact", False)
+        self.float32_prices = cfg.get("float32_prices", False)
+        self.memory_report = cfg.get("memory_report", False)
+
+class MetricsConfig:
+    """
+    Stage-level instrumentation settings (see shared/instrumentation.py).
+
+    Args:
+        cfg (dict): Dictionary with the optional keys listed below.
+        base_dir (Path): Base directory relative to the config file.
+
+    Attributes:
+        enabled (bool): Record wall/CPU time, rows and memory of every stage (off by default).
+        path (Path): JSON metrics file written at the end of a run.
+        profile (bool): Write a cProfile dump per stage call.
+        profile_dir (Path): Directory for the cProfile dumps.
+        trace_memory (bool): Report per-stage peak allocations with tracemalloc (slow).
+    """
+    def __init__(self, cfg: dict, base_dir: Path):
+        self.enabled = cfg.get("enabled", False)
+        self.path = base_dir / cfg.get("path", "metrics/metrics.json")
+        self.profile = cfg.get("profile", False)
+        self.profile_dir = base_dir / cfg.get("profile_dir", "metrics/profiles")
+        self.trace_memory = cfg.get("trace_memory", False)
+
+class CacheConfig:
+    """
+    Parsed-input cache settings (see shared/input_cache.py).
+
+    Args:
+        cfg (dict): Dictionary with optional 'enabled', 'path' and 'max_size_mb'.
+        base_dir (Path): Base directory relative to the config file.
+
+    Attributes:
+        enabled (bool): Load ccy, price and spot frames through the cache.
+        path (Path): Cache directory.
+        max_bytes (int): Size bound of the cache; least recently used entries are evicted.
+    """
+    def __init__(self, cfg: dict, base_dir: Path):
+        self.enabled = cfg.get("enabled", False)
+        self.path = base_dir / cfg.get("path", "cache")
+        self.max_bytes = int(cfg.get("max_size_mb", 2048) * 2**20)
+
+class IncrementalConfig:
+    """
+    Settings for incremental runs (see scripts/incremental.py).
+
+    Args:
+        cfg (dict): Dictionary with optional 'watermark_path' and 'partition_by'.
+        base_dir (Path): Base directory relative to the config file.
+
+    Attributes:
+        watermark_path (Path): JSON file holding the latest processed price timestamp.
+        partition_by (str): 'none' appends every delta to the output file (csv only),
+            'day' writes each delta as new part files under <output stem>/date=YYYY-MM-DD/.
+    """
+    def __init__(self, cfg: dict, base_dir: Path):
+        self.watermark_path = base_dir / cfg.get("watermark_path", "state/price_watermark.json")
+        self.partition_by = cfg.get("partition_by", "none")
+        if self.partition_by not in ("none", "day"):
+            raise ValueError(f"Unsupported incremental partition_by: {self.partition_by}")
+
+class SpotStoreConfig:
+    """
+    Spot rate store settings (see scripts/spot_store.py).
+
+    Args:
+        cfg (dict): Dictionary with optional 'enabled' and 'path'.
+        base_dir (Path): Base directory relative to the config file.
+
+    Attributes:
+        enabled (bool): Load spot rates from the store instead of the spot file.
+        path (Path): Store directory, filled by 'python scripts/spot_store.py ingest'.
+    """
+    def __init__(self, cfg: dict, base_dir: Path):
+        self.enabled = cfg.get("enabled", False)
+        self.path = base_dir / cfg.get("path", "spot_store")
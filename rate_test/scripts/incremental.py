@@ -0,0 +1,138 @@
+"""
+incremental.py
+
+Incremental FX price conversion for append-only price data.
+
+The latest processed price timestamp is saved as a watermark. Each run
+loads only the price rows after the watermark (pushed down into the
+parquet scan) plus the spot rates of their one-hour lookback, runs the
+PriceConverter steps on that delta and appends the result to the output:
+- partition_by 'none': appended to the output file (csv only)
+- partition_by 'day': one new part file per day under
+  <output dir>/<output stem>/date=YYYY-MM-DD/, named after the new watermark
+
+A run without a watermark converts the whole history and replaces the
+output: the csv file is overwritten, and the day partition directory is
+cleared before the new part files are written.
+
+The watermark is saved only after the output is written. Price rows at or
+before the watermark are never reprocessed, so rows arriving late with
+older timestamps are skipped; delete the watermark file to rebuild the
+output from scratch. If a run stops between writing and saving, the rerun
+rewrites the same day part files, while the csv file would get the delta twice.
+"""
+
+import copy
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from scripts.load_data import DataLoader
+from scripts.price_converter import PriceConverter
+from shared.instrumentation import instrument
+from shared.output_writer import OutputWriter
+
+class IncrementalPriceConverter:
+    """
+    Converts the price rows newer than the saved watermark and appends the result.
+
+    Args:
+        config (Config): Config object; config.incremental holds the watermark
+            path and the output partitioning.
+        loader (DataLoader, optional): Loader to read the inputs with.
+    """
+
+    def __init__(self, config, loader: Optional[DataLoader] = None):
+        self.config = config
+        self.loader = loader or DataLoader(config)
+        self.watermark_path = config.incremental.watermark_path
+        self.partition_by = config.incremental.partition_by
+
+    def load_watermark(self) -> Optional[pd.Timestamp]:
+        """
+        Latest processed price timestamp, or None before the first run.
+        """
+        try:
+            with open(self.watermark_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        return pd.Timestamp(state["watermark"])
+
+    def save_watermark(self, watermark: pd.Timestamp, rows: int) -> None:
+        """
+        Atomically replace the watermark file.
+
+        Args:
+            watermark (pd.Timestamp): Latest processed price timestamp.
+            rows (int): Rows converted by the run, kept for reference.
+        """
+        self.watermark_path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "watermark": watermark.isoformat(),
+            "rows": rows,
+            "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.watermark_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.watermark_path)
+
+    @instrument("IncrementalPriceConverter.run")
+    def run(self) -> int:
+        """
+        Convert the new price rows, write them and advance the watermark.
+
+        Returns:
+            int: Number of price rows converted (0 if there was nothing new).
+        """
+        watermark = self.load_watermark()
+        ccy_df, price_df, spot_df = self.loader.load_delta(watermark)
+        if price_df.empty:
+            return 0
+
+        converter = PriceConverter(self.config, ccy_df, price_df, spot_df)
+        converter.merge_conversion_info()
+        converter.match_spot_rates()
+        converter.calculate_new_prices()
+
+        new_watermark = price_df[self.config.columns.timestamp].max()
+        self.write(converter.price_df, new_watermark, replace=watermark is None)
+        self.save_watermark(new_watermark, len(price_df))
+        return len(price_df)
+
+    def write(self, df: pd.DataFrame, watermark: pd.Timestamp, replace: bool = False) -> None:
+        """
+        Append the converted delta to the output.
+
+        Args:
+            df (pd.DataFrame): Converted price rows.
+            watermark (pd.Timestamp): Watermark after this delta; names the day part files.
+            replace (bool): Replace the existing output instead of appending to it,
+                for a run that converted the whole history.
+        """
+        if self.partition_by == "none":
+            OutputWriter(self.config.output, append=not replace).write(df)
+            return
+
+        if replace and self.partition_dir().exists():
+            shutil.rmtree(self.partition_dir())
+
+        days = df[self.config.columns.timestamp].dt.strftime("%Y-%m-%d")
+        part = f"part-{watermark.strftime('%Y%m%dT%H%M%S%f')}{self.config.output.path.suffix}"
+        for day, day_df in df.groupby(days, sort=True):
+            output = copy.copy(self.config.output)
+            output.path = self.partition_dir() / f"date={day}" / part
+            output.path.parent.mkdir(parents=True, exist_ok=True)
+            OutputWriter(output).write(day_df)
+
+    def partition_dir(self) -> Path:
+        """Root directory of the day partitions, named after the output file."""
+        output_path = self.config.output.path
+        return output_path.parent / output_path.name.split(".")[0]
@@ -0,0 +1,431 @@
+"""
+live_service.py
+
+Long-running asyncio service that converts live FX price ticks.
+
+Instead of the batch main.py, the service consumes a newline-delimited JSON
+(NDJSON) stream from stdin or from local socket connections. Each line is
+either a spot update or a price tick, using the column names from config.json:
+
+    {"type": "spot", "timestamp": "...", "ccy_pair": "EURUSD", "spot_mid_rate": 1.13}
+    {"type": "price", "timestamp": "...", "ccy_pair": "EURUSD", "price": 1.5}
+
+Spot updates are applied immediately to a per-pair window. Price ticks are
+queued and converted in micro-batches with PriceConverter, so every tick gets
+the same convert_price, conversion_factor, spot_mid_rate, conversion_status
+and new_price as in the batch pipeline. A micro-batch is flushed when it
+reaches max_batch_size or when its oldest tick has waited max_latency_ms.
+Results are written back as NDJSON (to stdout, or to the connection the tick
+came from), and p50/p99 receive-to-emit latencies are reported on stderr.
+The conversion itself runs in a worker thread, so the event loop keeps
+reading messages while a batch is converted.
+
+A malformed message (not a JSON object, a missing field, an unparsable
+timestamp or a non-numeric price or spot rate) is answered with an error
+record instead of a result:
+
+    {"error": "ValueError: could not convert string to float: 'abc'", "message": "..."}
+
+If a whole micro-batch fails to convert, each of its ticks gets such a
+record and the service keeps running.
+
+Run from the rate_test directory:
+    python scripts/live_service.py < ticks.ndjson
+"""
+
+import asyncio
+import bisect
+import json
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to sys.path
+current_file = Path(__file__).resolve()
+project_root = current_file.parent.parent
+sys.path.insert(0, str(project_root))
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(project_root.parent))
+
+from scripts.config import Config
+from scripts.load_data import DataLoader
+from scripts.price_converter import PriceConverter
+
+class SpotWindow:
+    """
+    Latest spot rates per ccy_pair, kept sorted by timestamp.
+
+    Spots older than twice the tolerance behind the newest event seen are
+    dropped (the most recent spot of each pair is always kept), so ticks may
+    arrive up to one tolerance late and still match exactly.
+
+    Args:
+        tolerance (pd.Timedelta): Maximum age of a spot rate used for conversion.
+    """
+    def __init__(self, tolerance: pd.Timedelta):
+        self.retention_ns = 2 * tolerance.value
+        self.watermark_ns = np.iinfo(np.int64).min
+        self.times = {}
+        self.rates = {}
+
+    def update(self, pair: str, ts_ns: int, rate: float) -> None:
+        """Insert a spot rate and prune the pair's expired history."""
+        times = self.times.setdefault(pair, [])
+        rates = self.rates.setdefault(pair, [])
+        pos = bisect.bisect_right(times, ts_ns)
+        times.insert(pos, ts_ns)
+        rates.insert(pos, rate)
+        self.advance(ts_ns)
+        self._prune(pair)
+
+    def advance(self, ts_ns: int) -> None:
+        """Move the watermark forward to the newest timestamp seen."""
+        self.watermark_ns = max(self.watermark_ns, ts_ns)
+
+    def _prune(self, pair: str) -> None:
+        times, rates = self.times[pair], self.rates[pair]
+        cutoff = bisect.bisect_left(times, self.watermark_ns - self.retention_ns)
+        cutoff = min(cutoff, len(times) - 1)
+        if cutoff > 0:
+            del times[:cutoff]
+            del rates[:cutoff]
+
+    def to_frame(self, pairs, columns) -> pd.DataFrame:
+        """
+        Spot rates of the given pairs as a frame PriceConverter can consume.
+
+        Args:
+            pairs (Iterable[str]): ccy_pairs to include.
+            columns (ColumnConfig): Output column names.
+
+        Returns:
+            pd.DataFrame: Columns timestamp, ccy_pair and spot rate.
+        """
+        pairs = [p for p in pairs if p in self.times]
+        counts = [len(self.times[p]) for p in pairs]
+        return pd.DataFrame({
+            columns.timestamp: pd.to_datetime(
+                np.fromiter((t for p in pairs for t in self.times[p]), dtype=np.int64, count=sum(counts))
+            ),
+            columns.ccy_pair: np.repeat(np.array(pairs, dtype=object), counts),
+            columns.spot_rate: np.fromiter((r for p in pairs for r in self.rates[p]), dtype=np.float64,
+                                           count=sum(counts)),
+        })
+
+class LatencyStats:
+    """
+    Receive-to-emit latency counters over the most recent ticks.
+
+    Args:
+        maxlen (int): Number of recent latencies kept for the percentiles.
+    """
+    def __init__(self, maxlen: int = 100_000):
+        self.latencies_ns = deque(maxlen=maxlen)
+        self.ticks = 0
+        self.batches = 0
+
+    def record(self, latencies_ns: np.ndarray) -> None:
+        """Record the latencies of one emitted micro-batch."""
+        self.latencies_ns.extend(latencies_ns.tolist())
+        self.ticks += len(latencies_ns)
+        self.batches += 1
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: Tick and batch counts with p50/p99/max latency in milliseconds.
+        """
+        summary = {"ticks": self.ticks, "batches": self.batches}
+        if self.latencies_ns:
+            p50, p99 = np.percentile(np.fromiter(self.latencies_ns, dtype=np.int64), [50, 99])
+            summary.update(p50_ms=p50 / 1e6, p99_ms=p99 / 1e6, max_ms=max(self.latencies_ns) / 1e6)
+        return summary
+
+class Sink:
+    """
+    Destination of converted ticks, tracking how many are still queued.
+    """
+    def __init__(self):
+        self.pending = 0
+        self.flushed = asyncio.Event()
+        self.flushed.set()
+
+    def queued(self) -> None:
+        """A tick from this source entered the queue."""
+        self.pending += 1
+        self.flushed.clear()
+
+    def emitted(self, n: int) -> None:
+        """n ticks from this source were written."""
+        self.pending -= n
+        if self.pending == 0:
+            self.flushed.set()
+
+class StdoutSink(Sink):
+    """Writes NDJSON results to standard output."""
+    def write(self, data: str) -> None:
+        sys.stdout.write(data)
+
+    async def drain(self) -> None:
+        sys.stdout.flush()
+
+class SocketSink(Sink):
+    """Writes NDJSON results back to a socket client."""
+    def __init__(self, writer: asyncio.StreamWriter):
+        super().__init__()
+        self.writer = writer
+
+    def write(self, data: str) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(data.encode())
+
+    async def drain(self) -> None:
+        if not self.writer.is_closing():
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                # The client went away; its remaining results are dropped
+                pass
+
+class LiveConversionService:
+    """
+    Converts price ticks in micro-batches against a live spot window.
+
+    Args:
+        config (Config): Config object with column, format and live settings.
+        ccy_df (pd.DataFrame): Currency conversion rules.
+    """
+    def __init__(self, config: Config, ccy_df: pd.DataFrame):
+        self.config = config
+        self.ccy_df = ccy_df
+        self.tolerance = pd.Timedelta(config.live.tolerance)
+        self.max_batch_size = config.live.max_batch_size
+        self.max_latency_ns = int(config.live.max_latency_ms * 1e6)
+        self.spots = SpotWindow(self.tolerance)
+        self.stats = LatencyStats()
+        self.queue = asyncio.Queue()
+
+    def parse_time(self, value: str) -> int:
+        """Parse a message timestamp with the configured format into int64 ns."""
+        return pd.Timestamp(datetime.strptime(value, self.config.timestamp_format)).value
+
+    async def handle_line(self, line: bytes, sink) -> None:
+        """
+        Dispatch one NDJSON line: apply spot updates, queue price ticks.
+
+        Args:
+            line (bytes): Raw message.
+            sink (Sink): Destination for the converted tick.
+        """
+        received_ns = time.perf_counter_ns()
+        line = line.strip()
+        if not line:
+            return
+        col = self.config.columns
+
+        try:
+            msg = json.loads(line)
+            if not isinstance(msg, dict):
+                raise TypeError(f"expected a JSON object, got {type(msg).__name__}")
+            if msg.get("type") == "spot":
+                self.spots.update(msg[col.ccy_pair], self.parse_time(msg[col.timestamp]), float(msg[col.spot_rate]))
+                return
+            self.parse_time(msg[col.timestamp])
+            msg[col.price] = float(msg[col.price])
+        except (ValueError, KeyError, TypeError) as e:
+            await self.reply_error(sink, e, line.decode(errors="replace"))
+            return
+
+        sink.queued()
+        await self.queue.put((received_ns, msg, sink))
+
+    async def reply_error(self, sink, error: Exception, message) -> None:
+        """
+        Report a message that could not be converted, on stderr and to its sink.
+
+        Args:
+            sink (Sink): Destination of the message's result.
+            error (Exception): Why it could not be converted.
+            message (str | dict): The raw line or the parsed message.
+        """
+        print(f"Could not convert message {str(message)[:200]!r}: {error!r}", file=sys.stderr)
+        sink.write(json.dumps({"error": f"{type(error).__name__}: {error}", "message": message}, default=str) + "\n")
+        await sink.drain()
+
+    async def run_batches(self) -> None:
+        """
+        Collect queued ticks into micro-batches and convert them until a
+        None sentinel is received.
+        """
+        stopping = False
+        while not stopping:
+            first = await self.queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline_ns = first[0] + self.max_latency_ns
+
+            while len(batch) < self.max_batch_size:
+                if not self.queue.empty():
+                    item = self.queue.get_nowait()
+                else:
+                    timeout = (deadline_ns - time.perf_counter_ns()) / 1e9
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                lines = await self.convert_batch(batch)
+            except Exception as e:
+                # One failing batch must not stop the service: answer its ticks with errors
+                for _, msg, sink in batch:
+                    await self.reply_error(sink, e, msg)
+                    sink.emitted(1)
+                continue
+            await self.emit(batch, lines)
+
+    def price_frame(self, batch: list) -> pd.DataFrame:
+        """Price ticks of a micro-batch as a frame with parsed timestamps."""
+        col = self.config.columns
+        price_cols = [col.timestamp, col.price, col.ccy_pair]
+        price_df = pd.DataFrame([msg for _, msg, _ in batch], columns=price_cols)
+        price_df[col.timestamp] = pd.to_datetime(price_df[col.timestamp], format=self.config.timestamp_format)
+        return price_df
+
+    def convert_frame(self, price_df: pd.DataFrame, spot_df: pd.DataFrame) -> list:
+        """Run the PriceConverter steps and return one NDJSON line per tick."""
+        col = self.config.columns
+        converter = PriceConverter(self.config, self.ccy_df, price_df, spot_df)
+        converter.merge_conversion_info()
+        converter.match_spot_rates(tolerance=self.tolerance)
+        converter.calculate_new_prices()
+
+        result = converter.price_df
+        result[col.timestamp] = result[col.timestamp].dt.strftime(self.config.timestamp_format)
+        return result.to_json(orient="records", lines=True).splitlines()
+
+    async def convert_batch(self, batch: list) -> list:
+        """
+        Convert one micro-batch with PriceConverter.
+
+        The pandas work runs in the loop's default executor; the spot window
+        is only read on the event loop, where spot updates are applied.
+
+        Args:
+            batch (list): (received_ns, message, sink) tuples.
+
+        Returns:
+            list[str]: One NDJSON result line per tick, in batch order.
+        """
+        col = self.config.columns
+        loop = asyncio.get_running_loop()
+
+        price_df = await loop.run_in_executor(None, self.price_frame, batch)
+        self.spots.advance(price_df[col.timestamp].max().value)
+        spot_df = self.spots.to_frame(price_df[col.ccy_pair].unique(), col)
+        return await loop.run_in_executor(None, self.convert_frame, price_df, spot_df)
+
+    async def emit(self, batch: list, lines: list) -> None:
+        """
+        Write the result lines of a micro-batch to the sinks of their ticks.
+
+        Args:
+            batch (list): (received_ns, message, sink) tuples.
+            lines (list[str]): Result line of every tick of the batch.
+        """
+        sinks = {}
+        for (_, _, sink), line in zip(batch, lines):
+            sinks.setdefault(id(sink), (sink, []))[1].append(line)
+        for sink, sink_lines in sinks.values():
+            sink.write("\n".join(sink_lines) + "\n")
+            await sink.drain()
+            sink.emitted(len(sink_lines))
+
+        emitted_ns = time.perf_counter_ns()
+        self.stats.record(emitted_ns - np.fromiter((r for r, _, _ in batch), dtype=np.int64, count=len(batch)))
+
+    async def report_stats(self, interval_s: float) -> None:
+        """Print latency counters to stderr every interval_s seconds."""
+        while True:
+            await asyncio.sleep(interval_s)
+            print(json.dumps(self.stats.summary()), file=sys.stderr, flush=True)
+
+    async def serve_stdin(self) -> None:
+        """Read NDJSON from stdin until EOF, then flush pending ticks."""
+        loop = asyncio.get_running_loop()
+        sink = StdoutSink()
+        try:
+            reader = asyncio.StreamReader()
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+            async for line in reader:
+                await self.handle_line(line, sink)
+        except ValueError:
+            # Regular files cannot be watched by the event loop; read them from a
+            # thread in blocks, since a file never waits on a producer
+            while lines := await asyncio.to_thread(sys.stdin.buffer.readlines, 1 << 16):
+                for line in lines:
+                    await self.handle_line(line, sink)
+
+    async def serve_socket(self, host: str, port: int) -> None:
+        """Accept NDJSON connections on host:port until cancelled."""
+        async def handle_client(reader, writer):
+            sink = SocketSink(writer)
+            try:
+                async for line in reader:
+                    await self.handle_line(line, sink)
+                # Reply to every queued tick before closing the connection
+                await sink.flushed.wait()
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def run(self) -> None:
+        """Run the configured source together with the batcher."""
+        live = self.config.live
+        batcher = asyncio.create_task(self.run_batches())
+        reporter = asyncio.create_task(self.report_stats(live.stats_interval_s)) if live.stats_interval_s else None
+
+        try:
+            if live.source == "socket":
+                await self.serve_socket(live.host, live.port)
+            elif live.source == "stdin":
+                await self.serve_stdin()
+            else:
+                raise ValueError(f"Unsupported live source: {live.source}")
+        finally:
+            await self.queue.put(None)
+            await batcher
+            if reporter is not None:
+                reporter.cancel()
+            print(json.dumps(self.stats.summary()), file=sys.stderr, flush=True)
+
+def main():
+    """
+    Entry point for the live conversion service.
+    Loads config and currency rules, then serves ticks until the input ends.
+    """
+    config = Config(Path("config.json"))
+    ccy_df = DataLoader(config).load_ccy()
+    service = LiveConversionService(config, ccy_df)
+    try:
+        asyncio.run(service.run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
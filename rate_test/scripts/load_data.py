@@ -9,13 +9,41 @@ This includes:
 - Loading price and spot rate data
 - Ensuring proper timestamp parsing
 - Supporting both CSV and Parquet file types as specified in config.json
+- Streaming price data in batches for the chunked pipeline
+
+Parquet files are read with column projection, and spot rates with a
+timestamp-range filter covering the price data plus the spot lookback.
+Filters are pushed into the pyarrow dataset scan, so row groups whose
+statistics fall outside the range are never decompressed.
+
+With cache.enabled, the prepared ccy, price and spot frames are stored in
+the parsed-input cache (shared/input_cache.py) and memory-mapped back on
+later runs with unchanged inputs and settings.
+
+With spot_store.enabled, spot rates are read from the partitioned spot
+store (scripts/spot_store.py) instead, limited to the price data's pairs.
+
+CSV files with "engine": "arrow" are read with the multi-threaded pyarrow
+CSV reader: the timestamp, ccy_pair, price and spot rate columns get
+explicit types and timestamps are parsed while reading, giving the same
+dtypes as the pandas reader. With a time range the file is streamed block
+by block and filtered as it is read, and chunked runs stream price batches
+the same way, so large CSV files never need to fit in memory at once.
 """
 import pandas as pd
-from typing import Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from scripts.project_root import add_project_root
 add_project_root()
 
 from scripts.config import Config
+from scripts.spot_store import SpotStore
+from shared.compact_dtypes import compact_frame
+from shared.input_cache import InputCache
+from shared.instrumentation import instrument
 
 class DataLoader:
     """
@@ -26,9 +54,15 @@ class DataLoader:
 
     Attributes:
         config (Config): Stores the configuration used to load data.
+        cache (InputCache | None): Parsed-input cache, if enabled.
+        spot_lookback (pd.Timedelta): How far before the first price spot rates are needed.
     """
+
+    spot_lookback = pd.Timedelta("1h")
+
     def __init__(self, config: Config) -> None:
         self.config = config
+        self.cache = InputCache(config.cache.path, config.cache.max_bytes) if config.cache.enabled else None
 
     def load_all(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """
@@ -40,49 +74,493 @@ class DataLoader:
                 - Price data with datetime-converted timestamps
                 - Spot rate data with datetime-converted timestamps
         """
-        ccy_df = self._load(self.config.ccy)
-        price_df = self._load(self.config.price)
-        spot_df = self._load(self.config.spot)
+        ccy_df = self.load_ccy()
+        price_df = self.load_prices()
+        spot_df = self.load_spot_for(price_df)
 
-        # Retain only the necessary columns from price_df
-        price_cols = [
-        self.config.columns.timestamp,
-        self.config.columns.price,
-        self.config.columns.ccy_pair
-        ]
+        return ccy_df, price_df, spot_df
+
+    def load_prices(self) -> pd.DataFrame:
+        """
+        Loads all price rows with only the required columns.
+
+        Returns:
+            pd.DataFrame: Price data with datetime-converted timestamps.
+        """
+        price_cols = self._price_cols()
+        return self._cached(
+            self.config.price,
+            self._cache_params(self.config.price, price_cols),
+            lambda: self._prepare(self._load(self.config.price, price_cols), price_cols, prices=True),
+        )
+
+    def load_reference(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Loads the currency and spot rate data without the price data.
+
+        Used by the chunked pipeline, where prices are streamed with
+        iter_price_batches instead of being loaded at once.
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame]:
+                - Currency data
+                - Spot rate data with datetime-converted timestamps
+        """
+        return self.load_ccy(), self.load_spot(self._spot_range(*self._price_time_bounds()))
+
+    def load_ccy(self) -> pd.DataFrame:
+        """
+        Loads the currency conversion rules.
+
+        Returns:
+            pd.DataFrame: Currency data.
+        """
+        def load() -> pd.DataFrame:
+            ccy_df = self._load(self.config.ccy)
+            if self.config.dtypes.compact:
+                compact_frame(ccy_df, [self.config.columns.ccy_pair])
+            return ccy_df
+
+        return self._cached(self.config.ccy, self._cache_params(self.config.ccy), load)
+
+    def load_spot(self, time_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None,
+                  use_cache: bool = True, pairs=None) -> pd.DataFrame:
+        """
+        Loads the spot rate data with only the required columns.
+
+        Args:
+            time_range (tuple[pd.Timestamp, pd.Timestamp], optional): Inclusive
+                timestamp range to read. Pushed down into parquet reads.
+            use_cache (bool): Go through the parsed-input cache, if enabled.
+                Ranges that change every run are better read directly.
+            pairs (array-like, optional): ccy_pairs needed. Only used with the
+                spot store, which then opens just these pairs' partitions.
+
+        Returns:
+            pd.DataFrame: Spot rate data with datetime-converted timestamps.
+        """
+        spot_cols = self._spot_cols()
+        if self.config.spot_store.enabled:
+            spot_df = SpotStore(self.config.spot_store.path, self.config.columns).load(pairs, time_range)
+            pair_col = self.config.columns.ccy_pair
+            if not self.config.dtypes.compact:
+                spot_df[pair_col] = spot_df[pair_col].astype(object)
+            return spot_df[spot_cols]
+
+        def load() -> pd.DataFrame:
+            spot_df = self._prepare(self._load(self.config.spot, spot_cols, time_range), spot_cols)
+            if time_range is not None:
+                # The pushed-down filter is conservative; apply the exact range
+                timestamps = spot_df[self.config.columns.timestamp]
+                spot_df = spot_df[timestamps.between(*time_range)].reset_index(drop=True)
+            return spot_df
+
+        if not use_cache:
+            return load()
+        params = self._cache_params(self.config.spot, spot_cols, time_range=time_range)
+        return self._cached(self.config.spot, params, load)
+
+    def load_spot_for(self, price_df: pd.DataFrame, use_cache: bool = True) -> pd.DataFrame:
+        """
+        Loads the spot rates the given prices need: their pairs, over their
+        timestamp range plus the spot lookback.
+
+        Args:
+            price_df (pd.DataFrame): Price data with datetime-converted timestamps.
+            use_cache (bool): Go through the parsed-input cache, if enabled.
+
+        Returns:
+            pd.DataFrame: Spot rate data with datetime-converted timestamps;
+                empty if no price has a timestamp.
+        """
+        col = self.config.columns
+        timestamps = price_df[col.timestamp]
+        if timestamps.isna().all():
+            spot_df = pd.DataFrame({
+                col.timestamp: pd.Series(dtype="datetime64[ns]"),
+                col.ccy_pair: pd.Series(dtype="category" if self.config.dtypes.compact else object),
+                col.spot_rate: pd.Series(dtype="float64"),
+            })
+            return spot_df[self._spot_cols()]
+        return self.load_spot(self._spot_range(timestamps.min(), timestamps.max()), use_cache=use_cache,
+                              pairs=price_df[col.ccy_pair].unique())
+
+    def load_delta(self, watermark: Optional[pd.Timestamp]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Loads the price rows after the watermark with the spot rates they need.
+
+        Used by incremental runs; spot rates are read for the range of the
+        new prices plus the spot lookback only.
+
+        Args:
+            watermark (pd.Timestamp, optional): Latest timestamp already
+                processed; None loads every price row.
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+                - Currency data
+                - New price data with datetime-converted timestamps
+                - Spot rate data with datetime-converted timestamps
+        """
+        price_df = self.load_prices_after(watermark)
+        return self.load_ccy(), price_df, self.load_spot_for(price_df, use_cache=False)
+
+    def load_prices_after(self, watermark: Optional[pd.Timestamp]) -> pd.DataFrame:
+        """
+        Loads the price rows with a timestamp after the watermark.
+
+        The range is pushed down into parquet reads; the parsed-input cache
+        is bypassed because the range changes every run.
+
+        Args:
+            watermark (pd.Timestamp, optional): Latest timestamp already
+                processed; None loads every price row.
+
+        Returns:
+            pd.DataFrame: Price data with datetime-converted timestamps, in file order.
+        """
+        price_cols = self._price_cols()
+        time_range = None if watermark is None else (watermark, None)
+        price_df = self._prepare(self._load(self.config.price, price_cols, time_range), price_cols, prices=True)
+        if watermark is not None:
+            price_df = price_df[price_df[self.config.columns.timestamp] > watermark].reset_index(drop=True)
+        return price_df
+
+    def iter_price_batches(self, batch_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Streams the price data in batches of at most batch_size rows.
 
-        price_df = price_df[price_cols].copy()
+        Parquet files are read batch by batch from their row groups and CSV
+        files with pandas' chunked reader (or block by block with the arrow
+        engine), so only one batch is held in memory at a time. Batches keep
+        the original file order. A file without rows yields one empty batch,
+        so the output still gets its columns.
 
-        # Retain only the necessary columns from spot_df
-        spot_cols = [
+        Args:
+            batch_size (int): Maximum number of rows per batch.
+
+        Yields:
+            pd.DataFrame: Price batch with datetime-converted timestamps.
+        """
+        cfg_data = self.config.price
+        price_cols = self._price_cols()
+
+        if cfg_data.type == "csv" and cfg_data.engine == "arrow":
+            reader = pv.open_csv(cfg_data.path, **self._arrow_csv_options(cfg_data, price_cols))
+            batches = (table.to_pandas() for table in rebatch(reader, batch_size))
+        elif cfg_data.type == "csv":
+            batches = pd.read_csv(cfg_data.path, chunksize=batch_size, **cfg_data.read_args)
+        elif cfg_data.type == "parquet":
+            parquet_file = pq.ParquetFile(cfg_data.path)
+            batches = (batch.to_pandas() for batch in
+                       parquet_file.iter_batches(batch_size=batch_size, columns=price_cols))
+        else:
+            raise ValueError(f"Unsupported file type: {cfg_data.type}")
+
+        empty = True
+        for batch in batches:
+            empty = False
+            yield self._prepare(batch, price_cols, prices=True)
+        if empty:
+            batch = pd.DataFrame(columns=price_cols).astype({self.config.columns.price: "float64"})
+            yield self._prepare(batch, price_cols, prices=True)
+
+    def _price_cols(self) -> List[str]:
+        """Columns retained from the price data."""
+        return [
+            self.config.columns.timestamp,
+            self.config.columns.price,
+            self.config.columns.ccy_pair
+        ]
+
+    def _spot_cols(self) -> List[str]:
+        """Columns retained from the spot rate data."""
+        return [
             self.config.columns.timestamp,
             self.config.columns.ccy_pair,
             self.config.columns.spot_rate
         ]
-        spot_df = spot_df[spot_cols].copy()
 
-        # Ensure timestamps are parsed to datetime
+    def _cached(self, cfg_data: "ConfigData", params: Dict, load: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Return the cached frame for cfg_data and params, or load and cache it.
+
+        Cached frames are memory-mapped and partly read-only; the pipeline
+        copies or replaces columns before changing them.
+        """
+        if self.cache is None:
+            return load()
+        key = self.cache.key(cfg_data.path, params)
+        df = self.cache.get(cfg_data.path, key)
+        if df is None:
+            df = load()
+            self.cache.put(cfg_data.path, key, df)
+        return df
+
+    def _cache_params(self, cfg_data: "ConfigData", cols: Optional[List[str]] = None, **extra) -> Dict:
+        """Settings that determine the prepared frame of cfg_data, used in its cache key."""
+        dtypes = self.config.dtypes
+        return {
+            "type": cfg_data.type,
+            "read_args": cfg_data.read_args,
+            "columns": cols,
+            "timestamp_format": self.config.timestamp_format,
+            "compact": dtypes.compact,
+            "float32_prices": dtypes.float32_prices,
+            # Only the arrow CSV engine parses differently enough to need its own entries
+            **({"engine": cfg_data.engine} if cfg_data.type == "csv" and cfg_data.engine != "pandas" else {}),
+            **extra,
+        }
+
+    def _spot_range(self, start: pd.Timestamp, end: pd.Timestamp) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Spot rate range needed for prices between start and end, or None if unknown."""
+        if pd.isna(start) or pd.isna(end):
+            return None
+        return start - self.spot_lookback, end
+
+    def _price_time_bounds(self) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """
+        Earliest and latest price timestamp, read from the parquet row-group
+        statistics without scanning the data.
+
+        Returns:
+            tuple: (min, max) timestamps, or (None, None) if the price file is
+                not parquet or has no usable statistics.
+        """
+        cfg_data = self.config.price
+        if cfg_data.type != "parquet":
+            return None, None
+
+        metadata = pq.ParquetFile(cfg_data.path).metadata
         ts_col = self.config.columns.timestamp
-        ts_format = self.config.timestamp_format
+        index = metadata.schema.to_arrow_schema().get_field_index(ts_col)
+        if index < 0:
+            return None, None
 
-        price_df[ts_col] = pd.to_datetime(price_df[ts_col], format=ts_format)
-        spot_df[ts_col] = pd.to_datetime(spot_df[ts_col], format=ts_format)
+        lows, highs = [], []
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(index).statistics
+            if stats is None or not stats.has_min_max:
+                return None, None
+            lows.append(stats.min)
+            highs.append(stats.max)
+        if not lows:
+            return None, None
 
-        return ccy_df, price_df, spot_df
+        bounds = pd.to_datetime(pd.Series([min(lows), max(highs)]), format=self._stats_format(lows[0]))
+        return bounds.iloc[0], bounds.iloc[1]
 
-    def _load(self, cfg_data: "ConfigData") -> pd.DataFrame:
+    def _stats_format(self, value) -> Optional[str]:
+        """Format for parsing a statistics value: the configured format for strings."""
+        return self.config.timestamp_format if isinstance(value, str) else None
+
+    def _prepare(self, df: pd.DataFrame, cols: List[str], prices: bool = False) -> pd.DataFrame:
+        """
+        Retains only the given columns, parses the timestamp column and
+        applies the compact schema if enabled.
+
+        Args:
+            df (pd.DataFrame): Raw loaded data.
+            cols (list[str]): Columns to keep.
+            prices (bool): True for price data, whose price column may be narrowed to float32.
+
+        Returns:
+            pd.DataFrame: Copy of the selected columns with parsed timestamps.
+        """
+        df = df[cols].copy()
+
+        # Ensure timestamps are parsed to datetime
+        ts_col = self.config.columns.timestamp
+        df[ts_col] = pd.to_datetime(df[ts_col], format=self.config.timestamp_format)
+
+        dtypes = self.config.dtypes
+        category_cols = [self.config.columns.ccy_pair] if dtypes.compact else []
+        float32_cols = [self.config.columns.price] if prices and dtypes.float32_prices else []
+        return compact_frame(df, category_cols, float32_cols)
+
+    @instrument("DataLoader._load", describe=lambda self, cfg_data, *args, **kwargs: {"file": cfg_data.path.name})
+    def _load(self, cfg_data: "ConfigData", columns: Optional[List[str]] = None,
+              time_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None) -> pd.DataFrame:
         """
         Generic method to load a file using its type and read_args.
 
+        For parquet files, columns and time_range are pushed down into the
+        read. CSV files are read in full, except with the arrow engine, which
+        reads only the columns and streams the file through the time_range filter.
+
         Args:
             cfg_data (ConfigData): Configuration object for the file to load.
+            columns (list[str], optional): Columns to read.
+            time_range (tuple[pd.Timestamp, pd.Timestamp], optional): Inclusive
+                range of the timestamp column to read.
 
         Returns:
             pd.DataFrame: Loaded data as a pandas DataFrame.
         """
-        if cfg_data.type == "csv":
+        if cfg_data.type == "csv" and cfg_data.engine == "arrow":
+            return self._read_csv_arrow(cfg_data, columns, time_range).to_pandas(split_blocks=True, self_destruct=True)
+        elif cfg_data.type == "csv":
             return pd.read_csv(cfg_data.path, **cfg_data.read_args)
         elif cfg_data.type == "parquet":
-            return pd.read_parquet(cfg_data.path, **cfg_data.read_args)
+            read_args = dict(cfg_data.read_args)
+            if columns is not None:
+                read_args.setdefault("columns", columns)
+            if time_range is not None:
+                schema = pq.read_schema(cfg_data.path)
+                time_filter = time_range_filter(schema, self.config.columns.timestamp,
+                                                time_range, self.config.timestamp_format)
+                if time_filter is not None and "filters" not in read_args:
+                    read_args["filters"] = time_filter
+            return pd.read_parquet(cfg_data.path, **read_args)
         else:
-            raise ValueError(f"Unsupported file type: {cfg_data.type}")
\ No newline at end of file
+            raise ValueError(f"Unsupported file type: {cfg_data.type}")
+
+    def _read_csv_arrow(self, cfg_data: "ConfigData", columns: Optional[List[str]] = None,
+                        time_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None) -> pa.Table:
+        """
+        Read a CSV file with the multi-threaded pyarrow reader.
+
+        Without a time range the whole file is parsed in parallel blocks; with
+        one it is streamed and every block is filtered as it is read, so only
+        the matching rows are kept.
+        """
+        options = self._arrow_csv_options(cfg_data, columns)
+        ts_col = self.config.columns.timestamp
+        if time_range is None or (columns is not None and ts_col not in columns):
+            return pv.read_csv(cfg_data.path, **options)
+
+        reader = pv.open_csv(cfg_data.path, **options)
+        start, end = time_range
+        batches = []
+        for batch in reader:
+            timestamps = batch.column(ts_col)
+            if not pa.types.is_timestamp(timestamps.type):
+                # Unparsed timestamps are filtered after loading
+                batches.append(batch)
+                continue
+            keep = pc.is_valid(timestamps)
+            if start is not None:
+                keep = pc.and_(keep, pc.greater_equal(timestamps, pa.scalar(start, timestamps.type)))
+            if end is not None:
+                keep = pc.and_(keep, pc.less_equal(timestamps, pa.scalar(end, timestamps.type)))
+            batches.append(batch.filter(keep))
+        return pa.Table.from_batches(batches, schema=reader.schema)
+
+    def _arrow_csv_options(self, cfg_data: "ConfigData", columns: Optional[List[str]] = None) -> Dict:
+        """
+        Read, parse and convert options for the pyarrow CSV reader.
+
+        read_args accepts the pandas keys sep (or delimiter), encoding,
+        skiprows and quotechar, plus block_size (bytes per parsed block).
+        The known columns get explicit types, and the timestamp column is
+        parsed at read time when timestamp_format is an ISO 8601 layout (as
+        the default) or has no fractional seconds; other formats are read as
+        strings and parsed by _prepare as with the pandas reader.
+        """
+        read_args = dict(cfg_data.read_args)
+        read_options = pv.ReadOptions(
+            use_threads=True,
+            encoding=read_args.pop("encoding", "utf8"),
+            skip_rows=read_args.pop("skiprows", 0),
+            **({"block_size": read_args.pop("block_size")} if "block_size" in read_args else {}),
+        )
+        parse_options = pv.ParseOptions(
+            delimiter=read_args.pop("sep", read_args.pop("delimiter", ",")),
+            quote_char=read_args.pop("quotechar", '"'),
+        )
+        if read_args:
+            raise ValueError(f"read_args not supported by the arrow CSV engine: {sorted(read_args)}")
+
+        col = self.config.columns
+        column_types = {col.ccy_pair: pa.string(), col.price: pa.float64(), col.spot_rate: pa.float64()}
+        timestamp_parsers = arrow_timestamp_parsers(self.config.timestamp_format)
+        if timestamp_parsers is not None:
+            column_types[col.timestamp] = pa.timestamp("ns")
+        convert_options = pv.ConvertOptions(
+            column_types=column_types,
+            timestamp_parsers=timestamp_parsers or [],
+            include_columns=columns or [],
+            strings_can_be_null=True,
+        )
+        return {"read_options": read_options, "parse_options": parse_options, "convert_options": convert_options}
+
+def arrow_timestamp_parsers(timestamp_format: str) -> Optional[list]:
+    """
+    pyarrow CSV timestamp parsers equivalent to a strftime format, or None if
+    Arrow cannot parse it (fractional seconds other than in ISO 8601 layouts).
+    """
+    base_format = timestamp_format[:-len(".%f")] if timestamp_format.endswith(".%f") else timestamp_format
+    if base_format in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        return [pv.ISO8601]
+    if "%f" in timestamp_format:
+        return None
+    return [timestamp_format]
+
+def rebatch(reader: pv.CSVStreamingReader, batch_size: int) -> Iterator[pa.Table]:
+    """
+    Regroup the record batches of a streaming reader into tables of batch_size rows.
+    """
+    pending, pending_rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= batch_size:
+            table = pa.Table.from_batches(pending, schema=reader.schema)
+            yield table.slice(0, batch_size)
+            rest = table.slice(batch_size)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        yield pa.Table.from_batches(pending, schema=reader.schema)
+
+def time_range_filter(schema: pa.Schema, column: str, time_range: Tuple[pd.Timestamp, pd.Timestamp],
+                      timestamp_format: str) -> Optional[pc.Expression]:
+    """
+    Build a pyarrow dataset filter selecting an inclusive timestamp range.
+    Either bound may be None for an open-ended range.
+
+    Timestamp columns are compared directly. String columns are compared as
+    formatted strings, which only orders correctly for zero-padded formats
+    starting with '%Y-%m-%d'; for any other column type or format no filter
+    is returned and the caller must filter after loading.
+
+    Args:
+        schema (pa.Schema): Schema of the parquet file.
+        column (str): Timestamp column name.
+        time_range (tuple[pd.Timestamp, pd.Timestamp]): Inclusive (start, end).
+        timestamp_format (str): strftime format of string timestamps.
+
+    Returns:
+        pc.Expression | None: Filter expression, or None if it cannot be pushed down.
+    """
+    index = schema.get_field_index(column)
+    if index < 0:
+        return None
+
+    field_type = schema.field(index).type
+    start, end = time_range
+    low = high = None
+    if pa.types.is_timestamp(field_type):
+        if start is not None:
+            low = pa.scalar(start.to_datetime64(), field_type)
+        if end is not None:
+            high = pa.scalar(end.to_datetime64(), field_type)
+    elif (pa.types.is_string(field_type) or pa.types.is_large_string(field_type)) \
+            and timestamp_format.startswith("%Y-%m-%d"):
+        # Bounds are formatted to whole seconds: a string is a prefix of the
+        # same time with fractional digits, so the range stays inclusive
+        second_format = timestamp_format[:-len(".%f")] if timestamp_format.endswith(".%f") else timestamp_format
+        if start is not None:
+            low = start.floor("s").strftime(second_format)
+        if end is not None:
+            high = (end.floor("s") + pd.Timedelta(seconds=1)).strftime(second_format)
+    else:
+        return None
+
+    bounds = []
+    if low is not None:
+        bounds.append(pc.field(column) >= low)
+    if high is not None:
+        bounds.append(pc.field(column) <= high)
+    if not bounds:
+        return None
+    return bounds[0] if len(bounds) == 1 else bounds[0] & bounds[1]
\ No newline at end of file
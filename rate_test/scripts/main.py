@@ -2,44 +2,86 @@
 
 from pathlib import Path
 import sys
-import time
-
-print("sys.path:")
-for p in sys.path:
-    print("   ", p)
 
 # Add project root to sys.path
 current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent
 sys.path.insert(0, str(project_root))
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(project_root.parent))
 
 from scripts.config import Config
+from scripts.incremental import IncrementalPriceConverter
 from scripts.load_data import DataLoader
-from scripts.price_converter import PriceConverter
+from scripts.parallel_converter import ParallelPriceConverter
+from scripts.polars_backend import PolarsPriceConverter
+from scripts.price_converter import ChunkedPriceConverter, PriceConverter
+from shared.compact_dtypes import memory_report
+from shared.instrumentation import metrics
 
 def main():
     """
     Main entry point to run the FX price conversion pipeline.
     Loads config, reads data, runs transformations, and saves results.
     """
-    
-    # Uncomment to measure time elapsed
-    start_time = time.perf_counter()
-
     config = Config(Path("config.json"))
+
+    # Record wall/CPU time, rows and memory of every pipeline stage
+    metrics.configure(
+        enabled=config.metrics.enabled,
+        path=config.metrics.path,
+        profile_dir=config.metrics.profile_dir if config.metrics.profile else None,
+        trace_memory=config.metrics.trace_memory,
+    )
     loader = DataLoader(config)
-    ccy_df, price_df, spot_df = loader.load_all()
-
-    converter = PriceConverter(config, ccy_df, price_df, spot_df)
-    converter.merge_conversion_info()
-    converter.match_spot_rates()
-    converter.calculate_new_prices()
-    converter.export_results()
-
-    # Uncomment to measure time elapsed
-    end_time = time.perf_counter()
-    elapsed = end_time - start_time
-    print(f"Total execution time: {elapsed:.3f} seconds")
+
+    if config.execution.backend == "polars":
+        # Lazy scans and one multi-threaded polars query; no pandas loading
+        if config.execution.mode != "in_memory":
+            raise ValueError("The polars backend supports execution.mode 'in_memory' only")
+        converter = PolarsPriceConverter(config)
+        converter.merge_conversion_info()
+        converter.match_spot_rates()
+        converter.calculate_new_prices()
+        converter.export_results()
+    elif config.execution.mode == "incremental":
+        # Convert only the prices after the saved watermark and append them
+        rows = IncrementalPriceConverter(config, loader).run()
+        print(f"Converted {rows} new price rows")
+    elif config.execution.mode == "chunked":
+        # Stream prices in batches; only spot and ccy data stay in memory
+        if config.execution.spot_per_chunk:
+            # Each batch reads the spot rates of its own range
+            converter = ChunkedPriceConverter(config, loader.load_ccy(),
+                                              spot_loader=lambda batch: loader.load_spot_for(batch, use_cache=False))
+        else:
+            ccy_df, spot_df = loader.load_reference()
+            converter = ChunkedPriceConverter(config, ccy_df, spot_df)
+        converter.export_results(loader.iter_price_batches(config.execution.chunk_size))
+    elif config.execution.workers > 1:
+        # Convert ccy_pair partitions on a process pool
+        ccy_df, price_df, spot_df = loader.load_all()
+
+        converter = ParallelPriceConverter(config, ccy_df, price_df, spot_df)
+        converter.convert()
+        converter.export_results()
+    else:
+        ccy_df, price_df, spot_df = loader.load_all()
+
+        converter = PriceConverter(config, ccy_df, price_df, spot_df)
+        converter.merge_conversion_info()
+        converter.match_spot_rates()
+        converter.calculate_new_prices()
+        converter.export_results()
+
+        if config.dtypes.memory_report:
+            frames = {"ccy": ccy_df, "price": price_df, "spot": spot_df, "result": converter.price_df}
+            print(memory_report(frames).to_string())
+
+    metrics_path = metrics.write()
+    if metrics_path is not None:
+        print(metrics.summary().to_string())
+        print(f"Metrics written to {metrics_path}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
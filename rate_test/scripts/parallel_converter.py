@@ -0,0 +1,112 @@
+"""
+parallel_converter.py
+
+Runs the PriceConverter steps in parallel, partitioned by ccy_pair.
+
+Every ccy_pair is converted independently (the spot match is a per-pair
+as-of join), so price and spot data are split into per-pair partitions and
+converted on a process pool. Pairs with very many price rows (e.g. USDVND)
+can be split further by calendar day; each day partition then carries the
+spot rates from one tolerance before the start of the day, so the lookback
+stays exact. Results are reassembled in the original price row order.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.price_converter import PriceConverter
+from shared.instrumentation import instrument
+
+def _convert_partition(config, ccy_df: pd.DataFrame, price_df: pd.DataFrame, spot_df: pd.DataFrame,
+                       tolerance: pd.Timedelta) -> pd.DataFrame:
+    """
+    Worker entry point: run the PriceConverter steps on one partition.
+
+    Returns:
+        pd.DataFrame: Converted partition, in the partition's row order.
+    """
+    converter = PriceConverter(config, ccy_df, price_df, spot_df)
+    converter.merge_conversion_info()
+    converter.match_spot_rates(tolerance=tolerance)
+    converter.calculate_new_prices()
+    return converter.price_df
+
+class ParallelPriceConverter(PriceConverter):
+    """
+    PriceConverter that converts ccy_pair partitions on a process pool.
+
+    Args:
+        config (Config): Config object with column, format and execution settings
+        ccy_df (pd.DataFrame): Currency conversion rules
+        price_df (pd.DataFrame): Price data to transform
+        spot_df (pd.DataFrame): FX spot rate data
+    """
+
+    tolerance = pd.Timedelta("1h")
+
+    def partitions(self) -> List[Tuple[np.ndarray, pd.DataFrame, pd.DataFrame]]:
+        """
+        Split price and spot data into independent partitions.
+
+        With execution.partition_by == 'ccy_pair_day' every pair is split by
+        day; with 'ccy_pair' only pairs with at least execution.hot_pair_min_rows
+        price rows are.
+
+        Returns:
+            list[tuple[np.ndarray, pd.DataFrame, pd.DataFrame]]:
+                Original row positions, price rows and spot rows of each partition.
+        """
+        col = self.config.columns
+        execution = self.config.execution
+
+        spot_by_pair = self.spot_df.groupby(col.ccy_pair, sort=False, observed=True).indices
+        empty_spot = self.spot_df.iloc[:0]
+
+        partitions = []
+        for pair, positions in self.price_df.groupby(col.ccy_pair, sort=False, dropna=False, observed=True).indices.items():
+            pair_prices = self.price_df.iloc[positions]
+            pair_spot = self.spot_df.iloc[spot_by_pair[pair]] if pair in spot_by_pair else empty_spot
+
+            split_by_day = (
+                execution.partition_by == "ccy_pair_day"
+                or len(positions) >= execution.hot_pair_min_rows
+            )
+            if not split_by_day:
+                partitions.append((positions, pair_prices, pair_spot))
+                continue
+
+            pair_spot = pair_spot.sort_values(col.timestamp, kind="stable")
+            spot_times = pair_spot[col.timestamp].to_numpy()
+            days = pair_prices[col.timestamp].dt.floor("D")
+            for day, day_positions in pair_prices.groupby(days, sort=False, dropna=False, observed=True).indices.items():
+                # Include spot rates up to one tolerance before the day starts
+                lo = np.searchsorted(spot_times, (day - self.tolerance).to_datetime64(), side="left")
+                hi = np.searchsorted(spot_times, (day + pd.Timedelta(days=1)).to_datetime64(), side="left")
+                partitions.append((positions[day_positions], pair_prices.iloc[day_positions], pair_spot.iloc[lo:hi]))
+        return partitions
+
+    @instrument("ParallelPriceConverter.convert", frame="price_df")
+    def convert(self) -> None:
+        """
+        Convert all partitions on a process pool and reassemble self.price_df
+        in the original row order. Replaces merge_conversion_info,
+        match_spot_rates and calculate_new_prices.
+        """
+        partitions = self.partitions()
+        with ProcessPoolExecutor(max_workers=self.config.execution.workers) as pool:
+            futures = [
+                pool.submit(_convert_partition, self.config, self.ccy_df, prices, spot, self.tolerance)
+                for _, prices, spot in partitions
+            ]
+            results = [future.result() for future in futures]
+
+        if not results:
+            self.price_df = _convert_partition(self.config, self.ccy_df, self.price_df, self.spot_df, self.tolerance)
+            return
+
+        positions = np.concatenate([positions for positions, _, _ in partitions])
+        result = pd.concat(results, ignore_index=True)
+        self.price_df = result.iloc[np.argsort(positions, kind="stable")].reset_index(drop=True)
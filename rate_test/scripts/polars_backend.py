@@ -0,0 +1,139 @@
+"""
+polars_backend.py
+
+Polars implementation of the PriceConverter steps, selected with
+execution.backend = "polars" in config.json.
+
+The inputs are scanned lazily (only the needed columns, parsed at scan
+time), the steps only extend a query plan, and the plan is collected once
+by export_results, so polars can optimize and run the whole conversion on
+all cores:
+- merge_conversion_info: left join with the ccy rules on ccy_pair
+- match_spot_rates: backward join_asof by ccy_pair with an inclusive tolerance
+- calculate_new_prices: one conditional expression per row
+
+The output has the same rows, order, columns and values as the pandas
+PriceConverter. polars is an optional dependency (see
+shared/polars_backend.py).
+"""
+
+from typing import List
+
+import pandas as pd
+
+from scripts.compact_dtypes import CONVERSION_STATUSES
+from shared.instrumentation import instrument
+from shared.output_writer import OutputWriter
+from shared.polars_backend import parse_timestamps, pl, scan
+
+ROW = "_row"
+
+class PolarsPriceConverter:
+    """
+    Lazy polars counterpart of PriceConverter.
+
+    Args:
+        config (Config): Config object with file, column and format settings.
+        ccy (pl.LazyFrame, optional): Currency conversion rules; scanned from config by default.
+        price (pl.LazyFrame, optional): Price data with parsed timestamps; scanned by default.
+        spot (pl.LazyFrame, optional): FX spot rate data with parsed timestamps; scanned by default.
+    """
+
+    def __init__(self, config, ccy: "pl.LazyFrame" = None, price: "pl.LazyFrame" = None,
+                 spot: "pl.LazyFrame" = None):
+        if pl is None:
+            raise ImportError("The polars backend requires polars: pip install polars")
+        col = config.columns
+        self.config = config
+        self.ccy = ccy if ccy is not None else scan(config.ccy)
+        self.price = price if price is not None else self._scan_timestamps(
+            config.price, [col.timestamp, col.price, col.ccy_pair])
+        self.spot = spot if spot is not None else self._scan_timestamps(
+            config.spot, [col.timestamp, col.ccy_pair, col.spot_rate])
+
+        if config.dtypes.float32_prices:
+            self.price = self.price.with_columns(pl.col(col.price).cast(pl.Float32))
+        # Row numbers restore the price file order after the asof join
+        self.plan = self.price.with_row_index(ROW)
+
+    def _scan_timestamps(self, cfg_data, columns: List[str]) -> "pl.LazyFrame":
+        return parse_timestamps(scan(cfg_data, columns), self.config.columns.timestamp,
+                                self.config.timestamp_format)
+
+    def merge_conversion_info(self) -> None:
+        """
+        Left join the conversion rules on ccy_pair; pairs without rules need no conversion.
+        """
+        col = self.config.columns
+        self.plan = self.plan.join(self.ccy, on=col.ccy_pair, how="left").with_columns(
+            pl.col(col.convert_price).fill_null(False).cast(pl.Boolean),
+            pl.col(col.conversion_factor).cast(pl.Float64),
+        )
+
+    def match_spot_rates(self, tolerance: pd.Timedelta = pd.Timedelta("1h")) -> None:
+        """
+        For rows requiring conversion, match the most recent spot rate of the
+        same ccy_pair within tolerance, and set conversion_status.
+
+        Args:
+            tolerance (pd.Timedelta): Maximum age of the matched spot rate.
+        """
+        col = self.config.columns
+        spot = self.spot.sort([col.ccy_pair, col.timestamp], maintain_order=True)
+        matched = self.plan.sort(col.timestamp, maintain_order=True).join_asof(
+            spot,
+            on=col.timestamp,
+            by=col.ccy_pair,
+            strategy="backward",
+            tolerance=pd.Timedelta(tolerance).to_pytimedelta(),
+            check_sortedness=False,
+        )
+
+        no_conversion, done, failed = CONVERSION_STATUSES
+        convert = pl.col(col.convert_price)
+        self.plan = matched.with_columns(
+            pl.when(convert).then(pl.col(col.spot_rate)).alias(col.spot_rate),
+        ).with_columns(
+            pl.when(~convert).then(pl.lit(no_conversion))
+            .when(pl.col(col.spot_rate).is_not_null()).then(pl.lit(done))
+            .otherwise(pl.lit(failed))
+            .alias("conversion_status"),
+        ).sort(ROW)
+
+    def calculate_new_prices(self) -> None:
+        """
+        new_price is price / conversion_factor + spot rate for converted rows,
+        null where no spot rate was found and the price otherwise.
+        """
+        col = self.config.columns
+        _, done, failed = CONVERSION_STATUSES
+        status = pl.col("conversion_status")
+        price = pl.col(col.price)
+        self.plan = self.plan.with_columns(
+            pl.when(status == done).then(price / pl.col(col.conversion_factor) + pl.col(col.spot_rate))
+            .when(status == failed).then(None)
+            .otherwise(price)
+            .cast(self.plan.collect_schema()[col.price])
+            .alias("new_price")
+        )
+
+    def collect(self) -> pd.DataFrame:
+        """
+        Run the query plan.
+
+        Returns:
+            pd.DataFrame: Result with the same columns as PriceConverter.price_df.
+        """
+        return self.plan.drop(ROW).collect().to_pandas()
+
+    @instrument("PolarsPriceConverter.export_results")
+    def export_results(self) -> pd.DataFrame:
+        """
+        Collect the plan and save the result in the configured output type.
+
+        Returns:
+            pd.DataFrame: The written result.
+        """
+        df = self.collect()
+        OutputWriter(self.config.output).write(df)
+        return df
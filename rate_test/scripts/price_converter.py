@@ -3,14 +3,37 @@ price_converter.py
 
 Contains a class for converting FX prices based on conversion rules and spot rates.
 
+With execution.low_memory enabled, PriceConverter keeps about one working
+copy of the price columns: the price frame is not copied (only the new
+columns are added, to a shallow copy), the conversion rules are mapped onto
+the rows through their position in the small ccy table instead of a full
+merge, and new_price is computed in one vectorized expression.
+
+ChunkedPriceConverter streams the prices, but by default loads the spot
+history for the whole price range once and shares it between batches, so
+its peak memory still grows with the spot data. With
+execution.spot_per_chunk every batch loads only its own spot range instead.
+That bounds memory by the batch, but costs one spot read per batch: cheap
+with the spot store or time-ordered parquet row groups, a full scan of the
+spot file per batch for CSV.
+
 # Note: security_id is present in the dataset but is not used in conversion logic.
 # The task requires a price per row, not per unique instrument or ID.
 """
 
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
+from scripts.compact_dtypes import conversion_status
+from scripts.spot_index import SpotRateIndex
+from shared.instrumentation import instrument
+from shared.output_writer import OutputWriter
+
 class PriceConverter:
-    def __init__(self, config, ccy_df: pd.DataFrame, price_df: pd.DataFrame, spot_df: pd.DataFrame):
+    def __init__(self, config, ccy_df: pd.DataFrame, price_df: pd.DataFrame, spot_df: pd.DataFrame,
+                 spot_index: SpotRateIndex = None):
         """
         Initializes the PriceConverter.
 
@@ -19,22 +42,41 @@ class PriceConverter:
             ccy_df (pd.DataFrame): Currency conversion rules
             price_df (pd.DataFrame): Price data to transform
             spot_df (pd.DataFrame): FX spot rate data
+            spot_index (SpotRateIndex, optional): Prebuilt index over spot_df. Pass one
+                to share it between converters; otherwise it is built on first use.
         """
         self.config = config
+        self.low_memory = config.execution.low_memory
         self.ccy_df = ccy_df
-        self.price_df = price_df.copy()
-        self.spot_df = spot_df.copy()
+        # Low-memory mode only adds columns, so the caller's arrays can be shared
+        self.price_df = price_df.copy(deep=not self.low_memory)
+        self.spot_df = spot_df
+        self.spot_index = spot_index
         self.result_df = None
 
+    @instrument("merge_conversion_info", frame="price_df")
     def merge_conversion_info(self) -> None:
         """
         Merge conversion rules (whether to convert and conversion factor)
         into the price data based on ccy_pair.
         """
+        if self.low_memory:
+            self._lookup_conversion_info()
+            return
+
         ccy_pair_col = self.config.columns.ccy_pair
+        ccy_df = self.ccy_df
+
+        # Compact mode: merge on one shared categorical so ccy_pair stays dictionary-encoded
+        price_pairs = self.price_df[ccy_pair_col]
+        if isinstance(price_pairs.dtype, pd.CategoricalDtype):
+            categories = price_pairs.cat.categories.union(pd.Index(ccy_df[ccy_pair_col].dropna().unique()))
+            pair_dtype = pd.CategoricalDtype(categories)
+            self.price_df[ccy_pair_col] = price_pairs.astype(pair_dtype)
+            ccy_df = ccy_df.assign(**{ccy_pair_col: ccy_df[ccy_pair_col].astype(pair_dtype)})
 
         self.price_df = self.price_df.merge(
-            self.ccy_df,
+            ccy_df,
             on=ccy_pair_col,
             how="left"
         )
@@ -47,56 +89,76 @@ class PriceConverter:
             self.price_df[self.config.columns.convert_price].fillna(False).astype(bool)
         )
 
-    def match_spot_rates(self) -> None:
+    def _lookup_conversion_info(self) -> None:
         """
-        For rows requiring conversion, find the most recent spot rate
-        within the hour preceding the price timestamp.
-
-        Uses pandas.merge_asof to join each price row with the most recent
-        spot rate for the same ccy_pair within a 1-hour tolerance.
+        Low-memory merge_conversion_info: map the rules onto the price rows by
+        the position of their ccy_pair in the rules, without copying the price
+        frame. Gives the same columns and dtypes as the left merge.
         """
         col = self.config.columns
+        rules = self.ccy_df.set_index(col.ccy_pair)
+        if not rules.index.is_unique:
+            raise ValueError("low_memory requires one conversion rule per ccy_pair")
 
-        # Prepare spot DataFrame: sort by timestamp and pair
-        self.spot_df = self.spot_df.sort_values(by=[col.timestamp, col.ccy_pair]).reset_index(drop=True)
+        # Position of each row's rule, -1 where its pair has none; categorical
+        # pairs are looked up once per category
+        pairs = self.price_df[col.ccy_pair]
+        if isinstance(pairs.dtype, pd.CategoricalDtype):
+            category_positions = np.append(rules.index.get_indexer(pairs.cat.categories), -1)
+            positions = category_positions[pairs.cat.codes.to_numpy()]
+        else:
+            positions = rules.index.get_indexer(pairs)
 
-        # Mask only rows that require conversion
-        mask_convert = self.price_df[col.convert_price] == True
-        to_merge = self.price_df[mask_convert].copy()
-        to_merge["merge_index"] = to_merge.index  # Temporary index to realign post-merge
-        to_merge = to_merge.sort_values(by=[col.timestamp, col.ccy_pair]).reset_index(drop=True)
-      
-        # Perform the asof merge to get the most recent spot rate within 1 hour
-        matched = pd.merge_asof(
-            to_merge,
-            self.spot_df,
-            by=col.ccy_pair,
-            left_on=col.timestamp,
-            right_on=col.timestamp,
-            direction='backward',
-            tolerance=pd.Timedelta("1h")
-        )
-        
-        # Assign matched spot rates back into the main price_df
-        self.price_df.loc[mask_convert, col.spot_rate] = matched[col.spot_rate].values
+        for name in rules.columns:
+            if name == col.convert_price:
+                # Pairs without a rule need no conversion (see merge_conversion_info)
+                convert = rules[name].fillna(False).astype(bool).to_numpy()
+                self.price_df[name] = np.append(convert, False)[positions]
+            else:
+                # Missing rules become NaN, upcasting as the merge does
+                self.price_df[name] = rules[name].array.take(positions, allow_fill=True)
 
-        col = self.config.columns
+    @instrument("match_spot_rates", frame="price_df")
+    def match_spot_rates(self, tolerance: pd.Timedelta = pd.Timedelta("1h")) -> None:
+        """
+        For rows requiring conversion, find the most recent spot rate
+        within the hour preceding the price timestamp.
+
+        Uses a SpotRateIndex (the merge_asof equivalent of a backward match
+        by ccy_pair) to find the most recent spot rate for the same ccy_pair
+        within a 1-hour tolerance. The index is built once and reused, so
+        neither the spot nor the price data is re-sorted.
 
+        Args:
+            tolerance (pd.Timedelta): Maximum age of the matched spot rate.
+        """
         col = self.config.columns
 
-#       Initialize conversion status column
-        self.price_df["conversion_status"] = "no_conversion_required"
+        # Build the per-pair spot index once
+        if self.spot_index is None:
+            self.spot_index = SpotRateIndex(self.spot_df, col)
 
-        # Para filas con convert_price == True
+        # Mask only rows that require conversion
         mask_convert = self.price_df[col.convert_price] == True
 
-        # Marca si spot_rate está asignado
-        mask_spot_assigned = self.price_df.loc[mask_convert, col.spot_rate].notna()
+        # Look up the most recent spot rate within 1 hour, in the original row order
+        self.price_df.loc[mask_convert, col.spot_rate] = self.spot_index.lookup(
+            self.price_df.loc[mask_convert, col.ccy_pair].to_numpy(),
+            self.price_df.loc[mask_convert, col.timestamp].to_numpy(),
+            tolerance=tolerance
+        )
 
-        # Actualiza estado según disponibilidad de spot_rate
-        self.price_df.loc[mask_convert & mask_spot_assigned, "conversion_status"] = "conversion_done"
-        self.price_df.loc[mask_convert & ~mask_spot_assigned, "conversion_status"] = "conversion_failed_no_spot_rate"
+        # Conversion status codes (see CONVERSION_STATUSES): rows not requiring
+        # conversion are 0, converted rows 1 if a spot rate was found, else 2
+        mask_spot_assigned = self.price_df[col.spot_rate].notna().to_numpy()
+        status_codes = np.where(
+            mask_convert.to_numpy(),
+            np.where(mask_spot_assigned, 1, 2),
+            0
+        ).astype(np.int8)
+        self.price_df["conversion_status"] = conversion_status(status_codes, self.config.dtypes.compact)
 
+    @instrument("calculate_new_prices", frame="price_df")
     def calculate_new_prices(self) -> None:
         """
         Vectorized calculation of new prices leveraging the 'conversion_status' column for efficiency.
@@ -116,6 +178,9 @@ class PriceConverter:
             None. The method modifies self.price_df in place, adding the 'new_price' column.
         """
         col = self.config.columns
+        if self.low_memory:
+            self._fused_new_prices()
+            return
         #df = self.price_df.copy()
 
         # Start with existing price as default for all rows
@@ -124,11 +189,11 @@ class PriceConverter:
         # Mask for rows where conversion was successfully done
         mask_conversion_done = self.price_df["conversion_status"] == "conversion_done"
 
-        # Vectorized calculation of new prices where conversion is done
+        # Vectorized calculation of new prices where conversion is done, kept in the price dtype
         self.price_df.loc[mask_conversion_done, "new_price"] = (
             self.price_df.loc[mask_conversion_done, col.price] / self.price_df.loc[mask_conversion_done, "conversion_factor"]
             + self.price_df.loc[mask_conversion_done, col.spot_rate]
-        )
+        ).astype(self.price_df["new_price"].dtype)
 
         # Mask for rows where conversion failed due to missing spot rate
         mask_conversion_failed = self.price_df["conversion_status"] == "conversion_failed_no_spot_rate"
@@ -136,11 +201,103 @@ class PriceConverter:
         # Assign NaN to new_price where conversion failed
         self.price_df.loc[mask_conversion_failed, "new_price"] = float("nan")
 
+    def _fused_new_prices(self) -> None:
+        """
+        Low-memory calculate_new_prices: one expression over the whole columns.
+
+        Rows without a spot rate have a NaN spot_mid_rate, so price / factor + spot
+        is already NaN for failed conversions.
+        """
+        col = self.config.columns
+        price = self.price_df[col.price].to_numpy()
+        convert = self.price_df[col.convert_price].to_numpy(dtype=bool)
+        factor = self.price_df[col.conversion_factor].to_numpy(dtype=np.float64)
+        spot = self.price_df[col.spot_rate].to_numpy(dtype=np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            new_price = np.where(convert, price / factor + spot, price)
+        self.price_df["new_price"] = new_price.astype(price.dtype, copy=False)
+
+    @instrument("export_results", frame="price_df")
     def export_results(self) -> None:
         """
-        Save the DataFrame with new prices to output path.
+        Save the DataFrame with new prices to output path, in the configured output type.
+        """
+        OutputWriter(self.config.output).write(self.price_df)
+
+class ChunkedPriceConverter:
+    """
+    Runs the PriceConverter steps over a stream of price batches.
+
+    The spot data is filtered to the pairs that require conversion and
+    indexed once, then shared by every batch, so each price row is matched
+    against the complete spot history and the 1h lookback is exact no matter
+    where batch boundaries fall. With a spot_loader instead, every batch
+    loads and indexes the spot rates of its own range plus the lookback,
+    which gives the same matches. Only one price batch and its result are
+    held in memory at a time, and each result is written as soon as it is
+    converted.
+
+    Args:
+        config (Config): Config object with column and format settings
+        ccy_df (pd.DataFrame): Currency conversion rules
+        spot_df (pd.DataFrame, optional): FX spot rate data shared by every batch
+        spot_loader (Callable[[pd.DataFrame], pd.DataFrame], optional): Returns
+            the spot rates a price batch needs, e.g. DataLoader.load_spot_for;
+            used instead of spot_df.
+    """
+    def __init__(self, config, ccy_df: pd.DataFrame, spot_df: Optional[pd.DataFrame] = None,
+                 spot_loader: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None):
+        if (spot_df is None) == (spot_loader is None):
+            raise ValueError("Pass either spot_df or spot_loader")
+        col = config.columns
+        self.config = config
+        self.ccy_df = ccy_df
+        self.spot_loader = spot_loader
+        self.convertible_pairs = ccy_df.loc[ccy_df[col.convert_price] == True, col.ccy_pair]
+        if spot_df is not None:
+            self.spot_df, self.spot_index = self._index(spot_df)
+
+    def _index(self, spot_df: pd.DataFrame) -> Tuple[pd.DataFrame, SpotRateIndex]:
+        """Spot rates of the convertible pairs and their index."""
+        col = self.config.columns
+        spot_df = spot_df[spot_df[col.ccy_pair].isin(self.convertible_pairs)]
+        return spot_df, SpotRateIndex(spot_df, col)
+
+    def convert_batches(self, price_batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Convert each price batch independently.
+
+        Args:
+            price_batches (Iterable[pd.DataFrame]): Price batches, e.g. from
+                DataLoader.iter_price_batches.
+
+        Yields:
+            pd.DataFrame: Converted batch with the same columns as PriceConverter.price_df.
+        """
+        for batch in price_batches:
+            if self.spot_loader is None:
+                spot_df, spot_index = self.spot_df, self.spot_index
+            else:
+                spot_df, spot_index = self._index(self.spot_loader(batch))
+            converter = PriceConverter(self.config, self.ccy_df, batch, spot_df, spot_index=spot_index)
+            converter.merge_conversion_info()
+            converter.match_spot_rates()
+            converter.calculate_new_prices()
+            yield converter.price_df
+
+    @instrument("ChunkedPriceConverter.export_results")
+    def export_results(self, price_batches: Iterable[pd.DataFrame]) -> int:
+        """
+        Convert the price batches and append each result to the output path.
+
+        Args:
+            price_batches (Iterable[pd.DataFrame]): Price batches to convert.
+
+        Returns:
+            int: Total number of rows written.
         """
-        path = self.config.output.path
-        fmt = self.config.output.type
-        args = self.config.output.read_args
-        self.price_df.to_csv(path, index=False, **args)
\ No newline at end of file
+        with OutputWriter(self.config.output) as writer:
+            for result in self.convert_batches(price_batches):
+                writer.write_batch(result)
+        return writer.rows_written
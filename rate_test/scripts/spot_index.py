@@ -0,0 +1,96 @@
+"""
+spot_index.py
+
+Per-pair index over FX spot rates for fast "latest rate within tolerance" lookups.
+
+The index is built once from the spot data and replaces the sort +
+pandas.merge_asof join that PriceConverter.match_spot_rates used to run on
+every call. Lookups are vectorized with numpy.searchsorted, so converting a
+single price, a small batch or a full frame all reuse the same sorted arrays.
+"""
+
+import numpy as np
+import pandas as pd
+
+class SpotRateIndex:
+    """
+    Sorted spot timestamps and rates grouped by ccy_pair.
+
+    All pairs share two flat arrays sorted by (ccy_pair, timestamp); offsets
+    gives the slice of each pair. Rows with equal pair and timestamp keep
+    their original order, and the last one wins on lookup.
+
+    Args:
+        spot_df (pd.DataFrame): Spot rate data with parsed timestamps.
+        columns (ColumnConfig): Column names for timestamp, ccy_pair and spot rate.
+
+    Attributes:
+        pairs (pd.Index): Distinct ccy_pairs; position i owns offsets[i]:offsets[i + 1].
+        timestamps (np.ndarray): int64 nanosecond timestamps sorted within each pair.
+        rates (np.ndarray): Spot rates aligned with timestamps.
+        offsets (np.ndarray): Start offset of each pair, plus the total length.
+    """
+    def __init__(self, spot_df: pd.DataFrame, columns):
+        codes, uniques = pd.factorize(spot_df[columns.ccy_pair])
+        timestamps = spot_df[columns.timestamp].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        rates = spot_df[columns.spot_rate].to_numpy(dtype=np.float64)
+
+        self.pairs = pd.Index(uniques)
+        if self._is_sorted(codes, timestamps):
+            # e.g. spot data read from the SpotStore, which is stored sorted
+            self.timestamps, self.rates = timestamps, rates
+        else:
+            # lexsort is stable, so duplicates keep their original order
+            order = np.lexsort((timestamps, codes))
+            self.timestamps = timestamps[order]
+            self.rates = rates[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(uniques)))])
+
+    @staticmethod
+    def _is_sorted(codes: np.ndarray, timestamps: np.ndarray) -> bool:
+        """True if rows are already ordered by (pair code, timestamp)."""
+        code_steps = np.diff(codes)
+        return bool((code_steps >= 0).all() and ((code_steps > 0) | (np.diff(timestamps) >= 0)).all())
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def lookup(self, pairs, timestamps, tolerance=pd.Timedelta("1h")) -> np.ndarray:
+        """
+        Most recent spot rate at or before each timestamp, for the same pair.
+
+        Equivalent to pandas.merge_asof(direction='backward', by=ccy_pair)
+        with an inclusive tolerance.
+
+        Args:
+            pairs (array-like): ccy_pair of each query.
+            timestamps (array-like): Query timestamps (datetime64-compatible).
+            tolerance (pd.Timedelta | str): Maximum age of the matched spot rate.
+
+        Returns:
+            np.ndarray: Matched spot rates, NaN where no rate is within tolerance
+                or the pair is unknown.
+        """
+        query_ts = np.asarray(timestamps, dtype="datetime64[ns]").view(np.int64)
+        codes = self.pairs.get_indexer(np.asarray(pairs, dtype=object))
+        tolerance_ns = pd.Timedelta(tolerance).value
+        result = np.full(len(query_ts), np.nan)
+
+        # Visit the queries pair by pair, each against its own sorted slice
+        query_order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[query_order]
+        present = np.unique(sorted_codes[sorted_codes >= 0])
+        bounds = np.searchsorted(sorted_codes, np.concatenate([present, [present[-1] + 1]])) if len(present) else []
+
+        for i, code in enumerate(present):
+            rows = query_order[bounds[i]:bounds[i + 1]]
+            start, end = self.offsets[code], self.offsets[code + 1]
+            pair_ts = self.timestamps[start:end]
+
+            pos = np.searchsorted(pair_ts, query_ts[rows], side="right") - 1
+            matched = pos >= 0
+            age = query_ts[rows] - pair_ts[np.maximum(pos, 0)]
+            matched &= (age <= tolerance_ns) & (query_ts[rows] != np.iinfo(np.int64).min)
+
+            result[rows[matched]] = self.rates[start + pos[matched]]
+        return result
@@ -0,0 +1,228 @@
+"""
+spot_store.py
+
+On-disk spot rate store, partitioned by ccy_pair and date.
+
+Spot files are ingested once into uncompressed Arrow IPC partitions, one
+per ccy_pair and calendar day, each sorted by timestamp:
+
+    <store>/ccy_pair=EURUSD/date=2021-12-10.arrow
+    <store>/manifest.json    (rows and min/max timestamp of every partition)
+
+Loading spot rates for a set of pairs and a time range reads only the
+manifest and memory-maps the partitions whose pair matches and whose
+timestamp statistics overlap the range, so neither the whole spot history
+nor a gzip decompression or timestamp parse is paid on every run. The
+loaded frame is ordered by (ccy_pair, timestamp), which SpotRateIndex
+uses as is instead of sorting it again.
+
+Enable it with spot_store.enabled in config.json after ingesting the spot
+file, run from the rate_test directory:
+    python scripts/spot_store.py ingest                       # the configured spot file
+    python scripts/spot_store.py ingest data/more_spot.parq   # more files of the spot file type
+    python scripts/spot_store.py list
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Add project root to sys.path
+current_file = Path(__file__).resolve()
+project_root = current_file.parent.parent
+sys.path.insert(0, str(project_root))
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(project_root.parent))
+
+from scripts.config import Config
+from shared.instrumentation import instrument
+
+class SpotStore:
+    """
+    Spot rates stored as per-(ccy_pair, date) Arrow IPC partitions.
+
+    Args:
+        directory (Path): Store directory.
+        columns (ColumnConfig): Column names for timestamp, ccy_pair and spot rate.
+    """
+
+    manifest_file = "manifest.json"
+    suffix = ".arrow"
+
+    def __init__(self, directory: Path, columns):
+        self.directory = Path(directory)
+        self.columns = columns
+
+    def manifest(self) -> List[Dict]:
+        """
+        Partitions of the store: ccy_pair, date, path (relative), rows and min/max timestamp.
+        """
+        try:
+            with open(self.directory / self.manifest_file) as f:
+                return json.load(f)["partitions"]
+        except FileNotFoundError:
+            return []
+
+    def partition_path(self, pair: str, date: str) -> Path:
+        """File of the partition holding one pair's spot rates of one day."""
+        return self.directory / f"ccy_pair={pair}" / f"date={date}{self.suffix}"
+
+    @instrument("SpotStore.ingest")
+    def ingest(self, spot_df: pd.DataFrame) -> int:
+        """
+        Add spot rates to the store.
+
+        Rows are merged into the existing partitions of their pair and day;
+        rows with equal timestamps keep their order (existing rows first).
+        Rows repeating the timestamp and spot rate of a stored row are
+        dropped, so ingesting the same file again leaves the store unchanged.
+
+        Args:
+            spot_df (pd.DataFrame): Spot rates with parsed timestamps.
+
+        Returns:
+            int: Number of partitions written.
+        """
+        col = self.columns
+        spot_df = spot_df[[col.timestamp, col.ccy_pair, col.spot_rate]]
+        spot_df = spot_df[spot_df[col.timestamp].notna() & spot_df[col.ccy_pair].notna()]
+        days = spot_df[col.timestamp].dt.strftime("%Y-%m-%d")
+
+        partitions = {(p["ccy_pair"], p["date"]): p for p in self.manifest()}
+        written = 0
+        for (pair, date), rows in spot_df.groupby([spot_df[col.ccy_pair].astype(str), days], sort=True, observed=True):
+            path = self.partition_path(pair, date)
+            part = rows[[col.timestamp, col.spot_rate]]
+            if path.exists():
+                part = pd.concat([self._read(path).to_pandas(), part], ignore_index=True)
+            part = part.sort_values(col.timestamp, kind="stable")
+            part = part.drop_duplicates([col.timestamp, col.spot_rate], keep="first").reset_index(drop=True)
+
+            self._write(path, pa.Table.from_pandas(part, preserve_index=False))
+            timestamps = part[col.timestamp]
+            partitions[pair, date] = {
+                "ccy_pair": pair,
+                "date": date,
+                "path": str(path.relative_to(self.directory)),
+                "rows": len(part),
+                "min_timestamp": timestamps.iloc[0].isoformat(),
+                "max_timestamp": timestamps.iloc[-1].isoformat(),
+            }
+            written += 1
+
+        self._write_manifest([partitions[key] for key in sorted(partitions)])
+        return written
+
+    @instrument("SpotStore.load")
+    def load(self, pairs: Optional[Iterable[str]] = None,
+             time_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None) -> pd.DataFrame:
+        """
+        Spot rates of the given pairs within an inclusive time range.
+
+        Only partitions whose pair and timestamp statistics overlap are opened.
+
+        Args:
+            pairs (Iterable[str], optional): ccy_pairs to load; None loads every pair.
+            time_range (tuple[pd.Timestamp, pd.Timestamp], optional): Inclusive range;
+                None loads everything.
+
+        Returns:
+            pd.DataFrame: timestamp, ccy_pair (categorical) and spot rate columns,
+                ordered by (ccy_pair, timestamp).
+        """
+        col = self.columns
+        wanted = None if pairs is None else {str(p) for p in pairs if pd.notna(p)}
+        start, end = time_range if time_range is not None else (None, None)
+
+        tables, pair_codes, codes = [], [], {}
+        for partition in self.manifest():
+            if wanted is not None and partition["ccy_pair"] not in wanted:
+                continue
+            if start is not None and pd.Timestamp(partition["max_timestamp"]) < start:
+                continue
+            if end is not None and pd.Timestamp(partition["min_timestamp"]) > end:
+                continue
+            table = self._read(self.directory / partition["path"])
+            code = codes.setdefault(partition["ccy_pair"], len(codes))
+            tables.append(table)
+            pair_codes.append(np.full(table.num_rows, code, dtype=np.int32))
+
+        if not tables:
+            return pd.DataFrame({
+                col.timestamp: pd.Series(dtype="datetime64[ns]"),
+                col.ccy_pair: pd.Series(dtype="category"),
+                col.spot_rate: pd.Series(dtype="float64"),
+            })
+
+        table = pa.concat_tables(tables)
+        spot_df = pd.DataFrame({
+            col.timestamp: table.column(col.timestamp).to_pandas(),
+            col.ccy_pair: pd.Categorical.from_codes(np.concatenate(pair_codes), categories=list(codes)),
+            col.spot_rate: table.column(col.spot_rate).to_pandas(),
+        })
+        if time_range is not None:
+            # Partition statistics only bound the range; apply it exactly
+            spot_df = spot_df[spot_df[col.timestamp].between(start, end)].reset_index(drop=True)
+        return spot_df
+
+    def _read(self, path: Path) -> pa.Table:
+        """Memory-map one partition."""
+        return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+    def _write(self, path: Path, table: pa.Table) -> None:
+        """Write a partition through a temporary file, so readers never see a partial one."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _write_manifest(self, partitions: List[Dict]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"partitions": partitions}, f, indent=2)
+        os.replace(tmp, self.directory / self.manifest_file)
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest spot files into the spot store, or list its partitions.")
+    parser.add_argument("command", choices=["ingest", "list"])
+    parser.add_argument("files", nargs="*", type=Path, help="Spot files to ingest (default: the configured spot file).")
+    parser.add_argument("--config", type=Path, default=Path("config.json"))
+    args = parser.parse_args()
+
+    # Imported here: load_data reads from the store when it is enabled
+    from scripts.load_data import DataLoader
+
+    config = Config(args.config)
+    store = SpotStore(config.spot_store.path, config.columns)
+
+    if args.command == "list":
+        partitions = pd.DataFrame(store.manifest())
+        print(partitions.to_string(index=False) if len(partitions) else f"{store.directory} is empty")
+        return
+
+    for path in args.files or [config.spot.path]:
+        spot_config = Config(args.config)
+        spot_config.spot.path = path.resolve() if args.files else path
+        # Read the source file itself, not the store or the parsed-input cache
+        spot_config.spot_store.enabled = False
+        spot_config.cache.enabled = False
+        spot_df = DataLoader(spot_config).load_spot()
+        written = store.ingest(spot_df)
+        print(f"Ingested {len(spot_df)} spot rows from {path} into {written} partitions of {store.directory}")
+
+if __name__ == "__main__":
+    main()
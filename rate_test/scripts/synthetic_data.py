@@ -0,0 +1,177 @@
+"""
+synthetic_data.py
+
+Generates synthetic input data for the FX price conversion pipeline.
+
+The generated files have the same schemas as the sample inputs:
+- ccy file (CSV): ccy_pair, convert_price, conversion_factor
+- price file (Parquet): index, timestamp (string), security_id, price, ccy_pair
+- spot file (Parquet): timestamp (string), ccy_pair, spot_mid_rate
+
+Row counts, the number of currency pairs and the frequency of spot rate
+gaps (hours in which a pair has no spot rate, so prices fail conversion)
+are configurable. Parquet files are written in row groups, so large
+datasets are never held in memory at once.
+
+Usage:
+    python scripts/synthetic_data.py --rows 1000000 --pairs 50 --out benchmark/data
+"""
+
+import argparse
+import itertools
+import sys
+from pathlib import Path
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent.parent))
+
+from shared.synthetic_data import write_row_groups
+
+CURRENCIES = [
+    "USD", "EUR", "GBP", "JPY", "CHF", "AUD", "NZD", "CAD", "SEK", "NOK",
+    "DKK", "PLN", "CZK", "HUF", "TRY", "ZAR", "MXN", "BRL", "CNH", "HKD",
+    "SGD", "KRW", "TWD", "INR", "IDR", "PHP", "THB", "VND", "RUB", "UAH",
+]
+
+# Arrow prints the microseconds of us timestamps itself, giving '%Y-%m-%d %H:%M:%S.%f' strings
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class RateDataGenerator:
+    """
+    Writes synthetic ccy, price and spot rate files.
+
+    Args:
+        price_rows (int): Number of price rows.
+        pairs (int): Number of distinct ccy_pairs.
+        spot_rows (int, optional): Number of spot rate rows before gaps are
+            removed. Defaults to price_rows.
+        securities (int): Number of distinct security_ids.
+        convert_fraction (float): Share of pairs that require conversion.
+        gap_frequency (float): Probability that a pair has no spot rates in a given hour.
+        days (int): Length of the generated time span in days.
+        start (str): Start of the time span.
+        row_group_size (int): Rows generated and written per Parquet row group.
+        seed (int): Random seed.
+    """
+
+    def __init__(self, price_rows: int, pairs: int = 50, spot_rows: int = None, securities: int = 2000,
+                 convert_fraction: float = 0.5, gap_frequency: float = 0.05, days: int = 2,
+                 start: str = "2021-12-08 20:00:00", row_group_size: int = 1_000_000, seed: int = 0):
+        all_pairs = ["".join(p) for p in itertools.permutations(CURRENCIES, 2)]
+        if pairs > len(all_pairs):
+            raise ValueError(f"At most {len(all_pairs)} ccy_pairs can be generated, got {pairs}")
+
+        self.price_rows = price_rows
+        self.spot_rows = price_rows if spot_rows is None else spot_rows
+        self.securities = securities
+        self.convert_fraction = convert_fraction
+        self.gap_frequency = gap_frequency
+        self.start = pd.Timestamp(start)
+        self.span_us = days * 24 * 3600 * 10**6
+        self.row_group_size = row_group_size
+        self.rng = np.random.default_rng(seed)
+
+        self.pairs = np.array(self.rng.choice(all_pairs, size=pairs, replace=False), dtype=object)
+        self.convert = self.rng.random(pairs) < convert_fraction
+        self.factors = np.where(self.convert, self.rng.choice([10.0, 100.0, 1000.0], size=pairs), np.nan)
+        self.rate_levels = np.exp(self.rng.uniform(np.log(0.5), np.log(25000.0), size=pairs))
+
+        # Hours without spot rates, per pair
+        self.gaps = self.rng.random((pairs, days * 24)) < gap_frequency
+
+    def write(self, out_dir: Path) -> Dict[str, Path]:
+        """
+        Write all three files into out_dir.
+
+        Args:
+            out_dir (Path): Target directory, created if missing.
+
+        Returns:
+            dict[str, Path]: Paths of the 'ccy', 'price' and 'spot' files.
+        """
+        out_dir.mkdir(parents=True, exist_ok=True)
+        paths = {
+            "ccy": out_dir / "rates_ccy_data.csv",
+            "price": out_dir / "rates_price_data.parq.gzip",
+            "spot": out_dir / "rates_spot_rate_data.parq.gzip",
+        }
+        self.write_ccy(paths["ccy"])
+        self.write_prices(paths["price"])
+        self.write_spot(paths["spot"])
+        return paths
+
+    def write_ccy(self, path: Path) -> None:
+        """Write the currency conversion rules as CSV."""
+        pd.DataFrame({
+            "ccy_pair": self.pairs,
+            "convert_price": self.convert,
+            "conversion_factor": self.factors,
+        }).to_csv(path, index=False)
+
+    def write_prices(self, path: Path) -> None:
+        """Write the price data as gzip Parquet, one row group per batch."""
+        write_row_groups(path, self._price_batches(), preserve_index=True)
+
+    def write_spot(self, path: Path) -> None:
+        """Write the spot rate data as gzip Parquet, dropping rates inside gap hours."""
+        write_row_groups(path, self._spot_batches())
+
+    def _price_batches(self) -> Iterator[pd.DataFrame]:
+        for lo in range(0, self.price_rows, self.row_group_size):
+            n = min(self.row_group_size, self.price_rows - lo)
+            pair_ids = self.rng.integers(0, len(self.pairs), size=n)
+            prices = self.rate_levels[pair_ids] * self.rng.lognormal(0.0, 0.01, size=n)
+            yield pd.DataFrame({
+                "timestamp": self._timestamps(n),
+                "security_id": np.char.add("id_", self.rng.integers(0, self.securities, size=n).astype(str)),
+                "price": np.round(prices, 4),
+                "ccy_pair": self.pairs[pair_ids],
+            }, index=pd.RangeIndex(lo, lo + n, name="index"))
+
+    def _spot_batches(self) -> Iterator[pd.DataFrame]:
+        for lo in range(0, self.spot_rows, self.row_group_size):
+            n = min(self.row_group_size, self.spot_rows - lo)
+            pair_ids = self.rng.integers(0, len(self.pairs), size=n)
+            offsets = self.rng.integers(0, self.span_us, size=n)
+
+            keep = ~self.gaps[pair_ids, offsets // (3600 * 10**6)]
+            pair_ids, offsets = pair_ids[keep], offsets[keep]
+            rates = self.rate_levels[pair_ids] * self.rng.lognormal(0.0, 0.001, size=len(pair_ids))
+            yield pd.DataFrame({
+                "timestamp": self._format(offsets),
+                "ccy_pair": self.pairs[pair_ids],
+                "spot_mid_rate": np.round(rates, 5),
+            })
+
+    def _timestamps(self, n: int) -> np.ndarray:
+        """n random timestamp strings within the time span."""
+        return self._format(self.rng.integers(0, self.span_us, size=n))
+
+    def _format(self, offsets_us: np.ndarray) -> np.ndarray:
+        """Format microsecond offsets from start like the sample data (with microseconds)."""
+        times = np.datetime64(self.start, "us") + offsets_us.astype("timedelta64[us]")
+        return pc.strftime(pa.array(times), format=TIMESTAMP_FORMAT).to_numpy(zero_copy_only=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic rate_test input data.")
+    parser.add_argument("--rows", type=int, required=True, help="Number of price rows.")
+    parser.add_argument("--pairs", type=int, default=50, help="Number of ccy_pairs.")
+    parser.add_argument("--spot-rows", type=int, default=None, help="Number of spot rows (default: --rows).")
+    parser.add_argument("--gap-frequency", type=float, default=0.05, help="Share of pair-hours without spot rates.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=Path("benchmark/data"))
+    args = parser.parse_args()
+
+    generator = RateDataGenerator(args.rows, pairs=args.pairs, spot_rows=args.spot_rows,
+                                  gap_frequency=args.gap_frequency, seed=args.seed)
+    for name, path in generator.write(args.out).items():
+        print(f"{name}: {path}")
+
+if __name__ == "__main__":
+    main()
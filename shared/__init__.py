@@ -0,0 +1,5 @@
+"""
+Helpers used by both rate_test and stdev_test: instrumentation, output
+writing, the parsed-input cache, compact dtypes, the polars scan helpers,
+and the benchmark and synthetic data machinery.
+"""
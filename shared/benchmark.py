@@ -0,0 +1,141 @@
+"""
+benchmark.py
+
+Scaling benchmark machinery for both pipelines.
+
+Each project's scripts/benchmark.py generates synthetic data for every
+requested size, writes a config.json for it and times its pipeline stages
+with timed_stage. Benchmark runs each size in a fresh process, so the
+reported peak RSS belongs to that size only, and assembles the report: one
+record per size and stage (seconds, rows per second and peak RSS), together
+with the git commit and package versions, so runs can be compared across
+versions.
+"""
+
+import json
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from shared.instrumentation import peak_rss_mb
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000, 50_000_000]
+
+@contextmanager
+def timed_stage(records: List[dict], stage: str, rows: int = None):
+    """
+    Append the wall time, throughput and peak RSS of the enclosed block to records.
+
+    Yields the record, so rows can be set inside the block when they are
+    only known after loading.
+    """
+    record = {"stage": stage, "rows": rows}
+    start = time.perf_counter()
+    yield record
+    seconds = time.perf_counter() - start
+    record.update({
+        "seconds": seconds,
+        "rows_per_second": record["rows"] / seconds if record["rows"] and seconds > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+    records.append(record)
+
+def total_record(records: List[dict], rows: int) -> dict:
+    """Record summing the seconds of all stage records."""
+    total = sum(record["seconds"] for record in records)
+    return {
+        "stage": "total",
+        "rows": rows,
+        "seconds": total,
+        "rows_per_second": rows / total if total > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+class Benchmark:
+    """
+    Runs a project's pipeline on generated data of every size and reports the timings.
+
+    Subclasses set project and pipeline and implement prepare and params.
+    pipeline(config_path, rows) runs and times the stages once and returns
+    the stage records followed by a total_record; it runs in a spawned
+    process, so it must be a module-level function.
+
+    Args:
+        config_path (Path): Project config.json, reused for every size by prepare.
+        work_dir (Path): Directory for generated data and outputs.
+    """
+
+    project: str = None
+    pipeline: Callable[[Path, int], List[dict]] = None
+
+    def __init__(self, config_path: Path, work_dir: Path):
+        self.config_path = config_path
+        self.work_dir = work_dir
+
+    def prepare(self, rows: int, regenerate: bool = False) -> Path:
+        """
+        Generate the data for one size (unless it exists) and write its config.json.
+
+        Returns:
+            Path: Config file for the size.
+        """
+        raise NotImplementedError
+
+    def params(self) -> Dict:
+        """Generator and config settings recorded in the report."""
+        raise NotImplementedError
+
+    def run(self, sizes: List[int], regenerate: bool = False) -> Dict:
+        """
+        Benchmark every size in a fresh process.
+
+        Returns:
+            dict: Run metadata and the list of stage records.
+        """
+        results = []
+        for rows in sizes:
+            config_path = self.prepare(rows, regenerate)
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                records = pool.submit(type(self).pipeline, config_path, rows).result()
+            results.extend(records)
+            total = records[-1]
+            peak = "n/a" if total["peak_rss_mb"] is None else f"{total['peak_rss_mb']:.0f} MB"
+            print(f"{rows:>12,} rows: {total['seconds']:.3f} s, peak RSS {peak}", file=sys.stderr)
+
+        return {
+            "project": self.project,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "packages": {"numpy": np.__version__, "pandas": pd.__version__, "pyarrow": pa.__version__},
+            "params": self.params(),
+            "results": results,
+        }
+
+def git_commit() -> str:
+    """Current git commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=Path(__file__).resolve().parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_report(report: Dict, output: Path) -> None:
+    """Write a Benchmark.run report as JSON and print its records."""
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(pd.DataFrame(report["results"]).to_string(index=False))
+    print(f"Results written to {output}")
@@ -0,0 +1,63 @@
+"""
+compact_dtypes.py
+
+Compact in-memory schema helpers for both pipelines.
+
+When dtypes.compact is enabled in config.json, identifier columns (ccy_pair,
+security_id) are stored as pandas categoricals (dictionary-encoded, with
+small integer codes) instead of Python object strings, and prices can
+optionally be narrowed to float32. memory_report summarizes the footprint
+of the pipeline frames.
+"""
+
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+def compact_frame(df: pd.DataFrame, category_cols: Iterable[str], float32_cols: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    Convert identifier columns to categoricals and optionally narrow floats.
+
+    Args:
+        df (pd.DataFrame): Frame to convert in place.
+        category_cols (Iterable[str]): Columns stored as categoricals.
+        float32_cols (Iterable[str]): Float columns narrowed to float32.
+
+    Returns:
+        pd.DataFrame: The same frame with compact dtypes.
+    """
+    for name in category_cols:
+        if name in df.columns and not isinstance(df[name].dtype, pd.CategoricalDtype):
+            df[name] = df[name].astype("category")
+    for name in float32_cols:
+        if name in df.columns:
+            df[name] = df[name].astype(np.float32)
+    return df
+
+def memory_report(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Deep memory usage of each frame, with its largest column.
+
+    Args:
+        frames (dict[str, pd.DataFrame]): Frames by name.
+
+    Returns:
+        pd.DataFrame: One row per frame with rows, total MB, bytes per row and
+            the dtype and size of its largest column.
+    """
+    rows = []
+    for name, df in frames.items():
+        usage = df.memory_usage(index=True, deep=True)
+        columns = usage.drop("Index")
+        largest = columns.idxmax() if len(columns) else None
+        rows.append({
+            "frame": name,
+            "rows": len(df),
+            "total_mb": usage.sum() / 2**20,
+            "bytes_per_row": usage.sum() / max(len(df), 1),
+            "largest_column": largest,
+            "largest_column_dtype": str(df[largest].dtype) if largest is not None else None,
+            "largest_column_mb": columns.max() / 2**20 if largest is not None else 0.0,
+        })
+    return pd.DataFrame(rows).set_index("frame")
@@ -0,0 +1,213 @@
+"""
+input_cache.py
+
+Cache of parsed input frames, stored as uncompressed Arrow IPC files.
+
+Loading an input means decompressing gzip Parquet or parsing CSV and then
+parsing the timestamp strings. The cache stores the frame the loader
+returns (selected columns, parsed timestamps, compact dtypes) and reads it
+back memory-mapped: numeric and timestamp columns are zero-copy, read-only
+views of the file, so a repeat run on unchanged inputs skips parsing.
+
+Entries are keyed by the SHA-256 of the source file plus the load
+parameters (columns, formats, read_args, dtypes, time range), so any change
+to the input or to the relevant config misses the cache. Source digests are
+remembered by file size and mtime, so unchanged files are not re-hashed.
+The cache is bounded in size; reading an entry marks it as recently used
+and the least recently used entries are evicted first.
+
+Command line, run from a project directory (rate_test or stdev_test); the
+cache settings are read from the 'cache' block of its config.json:
+    python ../shared/input_cache.py list
+    python ../shared/input_cache.py invalidate                 # everything
+    python ../shared/input_cache.py invalidate data/file.csv   # one source
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+# Add the repository root to sys.path
+current_file = Path(__file__).resolve()
+repository_root = current_file.parent.parent
+sys.path.insert(0, str(repository_root))
+
+from shared.instrumentation import instrument
+
+class InputCache:
+    """
+    Size-bounded LRU cache of DataFrames in memory-mapped Arrow IPC files.
+
+    Args:
+        directory (Path): Cache directory, created on first write.
+        max_bytes (int): Total size of the entries kept after each write.
+    """
+
+    suffix = ".arrow"
+    digests_file = "sources.json"
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def key(self, source: Path, params: Dict) -> str:
+        """
+        Cache key for a source file loaded with the given parameters.
+
+        Args:
+            source (Path): Input file.
+            params (dict): JSON-serializable load parameters.
+
+        Returns:
+            str: Hex digest identifying the parsed frame.
+        """
+        payload = json.dumps({"source": self.source_digest(source), "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def entry_path(self, source: Path, key: str) -> Path:
+        """File of an entry; named after its source so it can be invalidated by source."""
+        return self.directory / f"{Path(source).name}.{key[:32]}{self.suffix}"
+
+    @instrument("InputCache.get")
+    def get(self, source: Path, key: str) -> Optional[pd.DataFrame]:
+        """
+        Read an entry memory-mapped, or return None on a miss.
+
+        The returned frame's numeric and timestamp columns are read-only
+        views of the cache file; copy the frame before modifying it in place.
+        """
+        path = self.entry_path(source, key)
+        try:
+            source_file = pa.memory_map(str(path))
+        except FileNotFoundError:
+            return None
+        try:
+            table = pa.ipc.open_file(source_file).read_all()
+        except pa.ArrowInvalid:
+            # Truncated or foreign file: drop it and treat as a miss
+            path.unlink(missing_ok=True)
+            return None
+
+        os.utime(path)  # mark as recently used
+        return table.to_pandas(split_blocks=True)
+
+    @instrument("InputCache.put")
+    def put(self, source: Path, key: str, df: pd.DataFrame) -> None:
+        """
+        Store a frame as an uncompressed Arrow IPC file, then evict down to
+        max_bytes. Frames larger than max_bytes are not cached.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(df)
+
+        # Write to a temporary file and rename, so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+            if os.path.getsize(tmp) > self.max_bytes:
+                os.unlink(tmp)
+                return
+            os.replace(tmp, self.entry_path(source, key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def entries(self) -> List[Path]:
+        """Entry files, least recently used first."""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob(f"*{self.suffix}"), key=lambda p: p.stat().st_mtime_ns)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(p.stat().st_size for p in entries)
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+
+    def invalidate(self, sources: Optional[List[Path]] = None) -> int:
+        """
+        Delete the entries of the given source files, or every entry.
+
+        Args:
+            sources (list[Path], optional): Source files; None invalidates everything.
+
+        Returns:
+            int: Number of entries deleted.
+        """
+        names = None if sources is None else {Path(s).name for s in sources}
+        removed = 0
+        for path in self.entries():
+            if names is None or path.name.rsplit(".", 2)[0] in names:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if sources is None:
+            (self.directory / self.digests_file).unlink(missing_ok=True)
+        return removed
+
+    def source_digest(self, source: Path) -> str:
+        """
+        SHA-256 of a source file, reused while its size and mtime are unchanged.
+        """
+        source = Path(source).resolve()
+        stat = source.stat()
+        digests_path = self.directory / self.digests_file
+        try:
+            with open(digests_path) as f:
+                digests = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            digests = {}
+
+        known = digests.get(str(source))
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+
+        sha = hashlib.sha256()
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+
+        digests[str(source)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha.hexdigest()}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(digests, f, indent=2)
+        os.replace(tmp, digests_path)
+        return sha.hexdigest()
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the parsed-input cache.")
+    parser.add_argument("command", choices=["list", "invalidate"])
+    parser.add_argument("sources", nargs="*", type=Path, help="Source files to invalidate (default: all).")
+    parser.add_argument("--config", type=Path, default=Path("config.json"))
+    args = parser.parse_args()
+
+    # Both projects' Config classes read the same 'cache' block
+    config_path = args.config.resolve()
+    with open(config_path) as f:
+        settings = json.load(f).get("cache", {})
+    cache = InputCache(config_path.parent / settings.get("path", "cache"),
+                       int(settings.get("max_size_mb", 2048) * 2**20))
+
+    if args.command == "list":
+        for path in reversed(cache.entries()):
+            print(f"{path.stat().st_size / 2**20:10.1f} MB  {path.name}")
+    else:
+        removed = cache.invalidate(args.sources or None)
+        print(f"Removed {removed} cache entries from {cache.directory}")
+
+if __name__ == "__main__":
+    main()
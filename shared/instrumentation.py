@@ -0,0 +1,283 @@
+"""
+instrumentation.py
+
+Stage-level metrics for the pipeline.
+
+Pipeline stages are wrapped with the instrument decorator (or the
+metrics.stage context manager). While metrics are enabled, every stage
+call records:
+- wall and CPU time
+- rows in and rows out
+- RSS after the stage, the RSS change and the growth of the peak RSS
+- optionally the peak traced allocation above the stage start (tracemalloc)
+- optionally a cProfile dump per stage call
+
+Records are written as one JSON metrics file with a per-stage summary.
+When metrics are disabled (the default until configure is called) the
+decorator only adds a flag check. Stages running in worker processes are
+not recorded; the parent records the stage that runs the pool.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size in MB, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of the current process in MB, or None where resource is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        # Unix only; Windows has no resource module
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def _rows(value) -> Optional[int]:
+    """Row count of a DataFrame (or the first DataFrame in a tuple), else None."""
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, tuple):
+        for item in value:
+            if isinstance(item, pd.DataFrame):
+                return len(item)
+    return None
+
+class StageMetrics:
+    """
+    Collects one record per stage call.
+
+    Usage:
+        metrics.configure(enabled=True, path=Path("metrics/metrics.json"))
+        with metrics.stage("load") as record:
+            df = load()
+            record["rows_out"] = len(df)
+        metrics.write()
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path: Optional[Path] = None
+        self.profile_dir: Optional[Path] = None
+        self.trace_memory = False
+        self.records: List[dict] = []
+        self._calls: Dict[str, int] = {}
+        self._pid = None
+        self._stack: List[dict] = []
+        self._profiling = False
+        self._start_wall = None
+        self._start_cpu = None
+
+    @property
+    def active(self) -> bool:
+        """True if enabled in this process (forked workers inherit the flag but not the records)."""
+        return self.enabled and self._pid == os.getpid()
+
+    def configure(self, enabled: bool, path: Optional[Path] = None, profile_dir: Optional[Path] = None,
+                  trace_memory: bool = False) -> None:
+        """
+        Enable or disable collection and reset the records.
+
+        Args:
+            enabled (bool): Record stages.
+            path (Path, optional): JSON file written by write().
+            profile_dir (Path, optional): Directory for per-stage cProfile dumps; None disables profiling.
+            trace_memory (bool): Trace Python and NumPy allocations with tracemalloc
+                to report the peak allocation of every stage. Slows the pipeline down.
+        """
+        self.enabled = enabled
+        self.path = path
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.records = []
+        self._calls = {}
+        self._pid = os.getpid()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+        if enabled and trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if profile_dir is not None and enabled:
+            profile_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None, **details):
+        """
+        Record the enclosed block as one stage call.
+
+        Yields the record (or None when inactive); set record['rows_out'] inside
+        the block. Stages may nest: every level is recorded with its depth,
+        and only the outermost profiled stage writes a cProfile dump.
+
+        Args:
+            name (str): Stage name.
+            rows_in (int, optional): Input rows.
+            **details: Extra fields stored in the record (e.g. the file name).
+        """
+        if not self.active:
+            yield None
+            return
+
+        call = self._calls.get(name, 0)
+        self._calls[name] = call + 1
+        record = {"stage": name, "call": call, "depth": len(self._stack),
+                  "rows_in": rows_in, "rows_out": None, **details}
+
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the parent's peak so far before resetting it for this stage
+                self._stack[-1]["_traced_peak"] = max(self._stack[-1]["_traced_peak"], peak)
+            tracemalloc.reset_peak()
+            record["_traced_start"], record["_traced_peak"] = current, current
+
+        profiler = None
+        if self.profile_dir is not None and not self._profiling:
+            profiler = cProfile.Profile()
+            self._profiling = True
+
+        self._stack.append(record)
+        rss_before, peak_before = current_rss_mb(), peak_rss_mb()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+            self._stack.pop()
+
+            rss_after, peak_after = current_rss_mb(), peak_rss_mb()
+            record.update({
+                "wall_s": wall,
+                "cpu_s": cpu,
+                "rss_mb": rss_after,
+                "rss_delta_mb": rss_after - rss_before if rss_after is not None and rss_before is not None else None,
+                "peak_rss_mb": peak_after,
+                "peak_rss_growth_mb": peak_after - peak_before if peak_after is not None and peak_before is not None else None,
+            })
+
+            if self.trace_memory:
+                peak = max(record.pop("_traced_peak"), tracemalloc.get_traced_memory()[1])
+                record["traced_peak_delta_mb"] = (peak - record.pop("_traced_start")) / 2**20
+                if self._stack:
+                    self._stack[-1]["_traced_peak"] = max(self._stack[-1]["_traced_peak"], peak)
+
+            if profiler is not None:
+                self._profiling = False
+                dump = self.profile_dir / f"{name}.{call}.prof"
+                profiler.dump_stats(dump)
+                record["profile"] = str(dump)
+
+            self.records.append(record)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Totals per stage name, in first-call order.
+
+        Returns:
+            pd.DataFrame: calls, wall_s, cpu_s, rows_in, rows_out and the largest
+                peak RSS growth of every stage.
+        """
+        if not self.records:
+            return pd.DataFrame(columns=["calls", "wall_s", "cpu_s", "rows_in", "rows_out", "peak_rss_growth_mb"])
+        df = pd.DataFrame(self.records).astype({"rows_in": "Int64", "rows_out": "Int64"})
+        return df.groupby("stage", sort=False).agg(
+            calls=("stage", "size"),
+            wall_s=("wall_s", "sum"),
+            cpu_s=("cpu_s", "sum"),
+            rows_in=("rows_in", lambda rows: rows.sum(min_count=1)),
+            rows_out=("rows_out", lambda rows: rows.sum(min_count=1)),
+            peak_rss_growth_mb=("peak_rss_growth_mb", "max"),
+        )
+
+    def report(self) -> Dict:
+        """
+        Metrics of the run so far as a JSON-serializable dict.
+
+        Returns:
+            dict: Run totals, the per-stage summary and every stage record.
+        """
+        summary = self.summary().reset_index()
+        return {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "command": sys.argv,
+            "pid": self._pid,
+            "total_wall_s": time.perf_counter() - self._start_wall if self._start_wall is not None else None,
+            "total_cpu_s": time.process_time() - self._start_cpu if self._start_cpu is not None else None,
+            "peak_rss_mb": peak_rss_mb(),
+            "summary": json.loads(summary.to_json(orient="records")),
+            "stages": self.records,
+        }
+
+    def write(self, path: Optional[Path] = None) -> Optional[Path]:
+        """
+        Write report() as JSON to path (default: the configured path).
+
+        Returns:
+            Path | None: The file written, or None if metrics are inactive or no path is set.
+        """
+        path = path or self.path
+        if not self.active or path is None:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        return path
+
+metrics = StageMetrics()
+
+def instrument(name: str, frame: Optional[str] = None, describe: Optional[Callable] = None):
+    """
+    Decorator recording every call of a pipeline stage in metrics.
+
+    Rows in are taken from the attribute named frame on the instance (before
+    the call) or from the first DataFrame argument; rows out from the same
+    attribute after the call, or from the returned DataFrame.
+
+    Args:
+        name (str): Stage name.
+        frame (str, optional): Instance attribute holding the stage's frame,
+            for methods that update self in place (e.g. 'price_df').
+        describe (Callable, optional): Called with the stage's arguments;
+            returns a dict of extra record fields.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.active:
+                return func(*args, **kwargs)
+
+            if frame is not None:
+                rows_in = _rows(getattr(args[0], frame, None))
+            else:
+                rows_in = next((len(a) for a in list(args) + list(kwargs.values()) if isinstance(a, pd.DataFrame)), None)
+            details = describe(*args, **kwargs) if describe is not None else {}
+
+            with metrics.stage(name, rows_in=rows_in, **details) as record:
+                result = func(*args, **kwargs)
+                record["rows_out"] = _rows(getattr(args[0], frame, None)) if frame is not None else _rows(result)
+            return result
+        return wrapper
+    return decorator
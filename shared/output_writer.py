@@ -0,0 +1,211 @@
+"""
+output_writer.py
+
+Writes result frames to the output file configured in config.json.
+
+Supports the output_file types:
+- 'csv': pandas to_csv with the configured read_args (sep, encoding, ...)
+- 'parquet': Arrow/Parquet with compression and dictionary-encoded string columns
+- 'feather' (or 'ipc'/'arrow'): Arrow IPC file with optional compression
+
+Frames are written in row-group sized batches, either from one large frame
+(write), from a stream of small frames buffered into batches (write_stream)
+or batch by batch (write_batch inside a with block), so the conversion to
+Arrow never holds more than one batch at a time. Helper
+columns listed in output_file.drop_columns are left out.
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from shared.instrumentation import instrument
+
+class OutputWriter:
+    """
+    Writes DataFrames to a configured output file.
+
+    Usage:
+        OutputWriter(config.output).write(df)
+
+        with OutputWriter(config.output) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+    Args:
+        cfg_data (ConfigData): Output file configuration. write_args may hold
+            'compression', 'compression_level', 'row_group_size' and
+            'dictionary_encode'.
+        append (bool): Append to an existing CSV file instead of replacing it.
+    """
+    def __init__(self, cfg_data, append: bool = False):
+        self.path = cfg_data.path
+        self.type = cfg_data.type
+        self.read_args = cfg_data.read_args
+        self.write_args = getattr(cfg_data, "write_args", {})
+        self.drop_columns = getattr(cfg_data, "drop_columns", [])
+        self.append = append
+
+        self.row_group_size = self.write_args.get("row_group_size", 1_000_000)
+        self.compression = self.write_args.get("compression")
+        self.compression_level = self.write_args.get("compression_level")
+        self.dictionary_encode = self.write_args.get("dictionary_encode", True)
+
+        if self.type not in ("csv", "parquet", "feather", "ipc", "arrow"):
+            raise ValueError(f"Unsupported output type: {self.type}")
+        if append and self.type != "csv":
+            raise ValueError(f"Appending is only supported for csv output, not {self.type}")
+
+        self.rows_written = 0
+        self._started = False
+        self._writer = None
+        self._schema: Optional[pa.Schema] = None
+        self._dictionaries: Dict[str, pd.Index] = {}
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @instrument("OutputWriter.write")
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Write a complete frame, batch by batch, and close the file.
+
+        Args:
+            df (pd.DataFrame): Results to write.
+        """
+        with self:
+            if len(df) == 0:
+                self.write_batch(df)
+            for start in range(0, len(df), self.row_group_size):
+                self.write_batch(df.iloc[start:start + self.row_group_size])
+
+    @instrument("OutputWriter.write_stream")
+    def write_stream(self, frames: Iterable[pd.DataFrame], buffer_rows: Optional[int] = None) -> None:
+        """
+        Write a stream of frames and close the file.
+
+        Frames are buffered until they hold buffer_rows rows and written as
+        one batch, so many small frames (e.g. one per security) neither pile
+        up in memory nor each become a tiny row group. Up to buffer_rows rows
+        (by default row_group_size, 1M unless configured) are held at a time;
+        pass a smaller bound when the frames are large, at the cost of
+        smaller Parquet/Arrow row groups.
+
+        Args:
+            frames (Iterable[pd.DataFrame]): Results to write, all with the same columns.
+            buffer_rows (int, optional): Rows buffered before a batch is written.
+                Defaults to row_group_size.
+        """
+        buffer_rows = self.row_group_size if buffer_rows is None else buffer_rows
+        with self:
+            buffer, buffered = [], 0
+            for df in frames:
+                buffer.append(df)
+                buffered += len(df)
+                if buffered >= buffer_rows:
+                    self.write_batch(pd.concat(buffer, ignore_index=True))
+                    buffer, buffered = [], 0
+            if buffer:
+                self.write_batch(pd.concat(buffer, ignore_index=True))
+
+    def write_batch(self, df: pd.DataFrame) -> None:
+        """
+        Append one batch to the output file, creating it on the first call.
+
+        Args:
+            df (pd.DataFrame): Batch of results; every batch must have the same columns.
+        """
+        df = df.drop(columns=[c for c in self.drop_columns if c in df.columns])
+
+        if self.type == "csv":
+            continuing = self._started or self.append
+            # Appending to a non-empty file: its header must match the new rows
+            extending = self.append and not self._started and self.path.exists() and self.path.stat().st_size > 0
+            if extending:
+                self._check_header(df)
+            header = not (self._started or extending)
+            df.to_csv(self.path, mode="a" if continuing else "w", header=header, index=False, **self.read_args)
+        else:
+            table = self._to_arrow(df)
+            if self._writer is None:
+                self._writer = self._open(table.schema)
+            self._writer.write_table(table)
+        self._started = True
+        self.rows_written += len(df)
+
+    def close(self) -> None:
+        """Finish the file. Safe to call more than once."""
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+
+    def _check_header(self, df: pd.DataFrame) -> None:
+        """Refuse to append rows whose columns differ from the existing CSV header."""
+        existing = list(pd.read_csv(self.path, nrows=0, **self.read_args).columns)
+        if existing != [str(c) for c in df.columns]:
+            raise ValueError(f"Cannot append to {self.path}: it has columns {existing}, "
+                             f"the new rows have {list(df.columns)}")
+
+    def _open(self, schema: pa.Schema):
+        """Create the Parquet or IPC file writer for the given schema."""
+        if self.type == "parquet":
+            return pq.ParquetWriter(
+                self.path,
+                schema,
+                compression=self.compression or "snappy",
+                compression_level=self.compression_level,
+            )
+        # IPC files keep one dictionary per column, so later batches only add deltas
+        options = pa.ipc.IpcWriteOptions(compression=self.compression, emit_dictionary_deltas=True)
+        return pa.ipc.new_file(self.path, schema, options=options)
+
+    def _to_arrow(self, df: pd.DataFrame) -> pa.Table:
+        """
+        Convert a batch to Arrow with a schema that stays fixed across batches.
+
+        String columns are dictionary-encoded against a per-column dictionary
+        that only grows, so batches share codes and IPC files stay valid.
+        """
+        if self._schema is None:
+            self._schema = pa.Schema.from_pandas(df, preserve_index=False)
+            if self.dictionary_encode:
+                for name in self._string_columns(df):
+                    self._dictionaries[name] = pd.Index([], dtype=object)
+                    i = self._schema.get_field_index(name)
+                    self._schema = self._schema.set(i, pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+
+        arrays = []
+        for field in self._schema:
+            values = df[field.name]
+            if field.name in self._dictionaries:
+                arrays.append(self._encode(field.name, values))
+            else:
+                arrays.append(pa.Array.from_pandas(values, type=field.type))
+        return pa.Table.from_arrays(arrays, schema=self._schema)
+
+    def _encode(self, name: str, values: pd.Series) -> pa.DictionaryArray:
+        """Dictionary-encode values against the column's growing dictionary."""
+        dictionary = self._dictionaries[name]
+        new_values = pd.unique(values[~values.isin(dictionary) & values.notna()].astype(str))
+        if len(new_values):
+            dictionary = dictionary.append(pd.Index(new_values, dtype=object))
+            self._dictionaries[name] = dictionary
+
+        codes = dictionary.get_indexer(values)
+        indices = pa.array(codes.astype(np.int32), mask=codes < 0)
+        return pa.DictionaryArray.from_arrays(indices, pa.array(dictionary.to_numpy(), type=pa.string()))
+
+    @staticmethod
+    def _string_columns(df: pd.DataFrame) -> list:
+        """Object or categorical columns that hold strings."""
+        return [
+            name for name in df.columns
+            if (df[name].dtype == object or isinstance(df[name].dtype, pd.CategoricalDtype))
+            and pd.api.types.infer_dtype(df[name], skipna=True) in ("string", "empty", "categorical")
+        ]
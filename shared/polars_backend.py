@@ -0,0 +1,44 @@
+"""
+polars_backend.py
+
+Lazy input scanning for the polars backends of both pipelines.
+
+polars is an optional dependency, only imported here and by the project
+backends; pl is None when it is not installed.
+"""
+
+from typing import List, Optional
+
+try:
+    import polars as pl
+except ImportError:  # optional dependency, checked when the backend is used
+    pl = None
+
+def scan(cfg_data, columns: Optional[List[str]] = None) -> "pl.LazyFrame":
+    """
+    Lazily scan a configured input file.
+
+    Args:
+        cfg_data (ConfigData): Input file configuration ('csv' or 'parquet').
+        columns (list[str], optional): Columns to read.
+
+    Returns:
+        pl.LazyFrame: Scan of the file.
+    """
+    if cfg_data.type == "parquet":
+        lf = pl.scan_parquet(cfg_data.path)
+    elif cfg_data.type == "csv":
+        lf = pl.scan_csv(cfg_data.path, separator=cfg_data.read_args.get("sep", ","))
+    else:
+        raise ValueError(f"Unsupported file type: {cfg_data.type}")
+    return lf.select(columns) if columns is not None else lf
+
+def parse_timestamps(lf: "pl.LazyFrame", column: str, timestamp_format: str) -> "pl.LazyFrame":
+    """
+    Parse a string timestamp column with a strftime format (kept as is if already a datetime).
+    """
+    if lf.collect_schema()[column] != pl.String:
+        return lf.with_columns(pl.col(column).cast(pl.Datetime("ns")))
+    # chrono writes fractional seconds with their dot as %.f
+    chrono_format = timestamp_format.replace(".%f", "%.f")
+    return lf.with_columns(pl.col(column).str.to_datetime(chrono_format, time_unit="ns"))
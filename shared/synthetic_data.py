@@ -0,0 +1,42 @@
+"""
+synthetic_data.py
+
+Parquet writing for the synthetic data generators of both pipelines.
+
+Generators produce their data as a sequence of DataFrames; each one is
+written as a gzip Parquet row group as soon as it is produced, so large
+datasets are never held in memory at once.
+"""
+
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+def write_row_groups(path: Path, frames: Iterable[pd.DataFrame], preserve_index: bool = False) -> int:
+    """
+    Write frames to a gzip Parquet file, one row group per frame.
+
+    Args:
+        path (Path): Target file.
+        frames (Iterable[pd.DataFrame]): Frames with the same schema; consumed lazily.
+        preserve_index (bool): Write the frame index as a column.
+
+    Returns:
+        int: Number of rows written.
+    """
+    writer = None
+    written = 0
+    try:
+        for df in frames:
+            table = pa.Table.from_pandas(df, preserve_index=preserve_index)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="gzip")
+            writer.write_table(table)
+            written += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
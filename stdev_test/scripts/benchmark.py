@@ -0,0 +1,148 @@
+"""
+benchmark.py
+
+Scaling benchmark for the stdev pipeline.
+
+For every requested size, a synthetic snap file is generated with
+StdevDataGenerator and the pipeline stages are timed one by one: load,
+the Preprocessor steps (convert_timestamps, sort_data, filter_time_range,
+detect_contiguous_blocks), calculate_rolling_std and the output write.
+start_calc/end_calc are set to cover the whole generated range, so every
+row is processed. Each size runs in a fresh process, so the reported peak
+RSS belongs to that size only.
+
+Results are written as JSON by shared/benchmark.py (one record per size
+and stage, with seconds, rows per second and peak RSS), together with the
+git commit and package versions, so runs can be compared across versions.
+
+Run from the stdev_test directory:
+    python scripts/benchmark.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+# Add project root to sys.path
+current_file = Path(__file__).resolve()
+project_root = current_file.parent.parent
+sys.path.insert(0, str(project_root))
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(project_root.parent))
+
+from scripts.config import DEFAULT_ROLLING, Config
+from scripts.load_data import StdevDataLoader
+from scripts.preprocessing import Preprocessor
+from scripts.stdev_calculator import StdevCalculator
+from scripts.synthetic_data import StdevDataGenerator
+from shared.benchmark import DEFAULT_SIZES, Benchmark, timed_stage, total_record, write_report
+from shared.output_writer import OutputWriter
+
+def _run_pipeline(config_path: Path, rows: int) -> List[dict]:
+    """
+    Worker entry point: run and time every stdev pipeline stage once.
+
+    rows is the requested size; the generator only approximates it, so the
+    records use the row count actually loaded.
+
+    Returns:
+        list[dict]: One record per stage; rows are the stage's input rows.
+    """
+    records = []
+    config = Config(config_path)
+    preprocessor = Preprocessor(config)
+
+    with timed_stage(records, "load") as record:
+        df = StdevDataLoader(config).load_data(time_range=preprocessor.time_range())
+        record["rows"] = rows = len(df)
+
+    stages = ["convert_timestamps", "sort_data", "filter_time_range", "detect_contiguous_blocks"]
+    if config.window_mode == "time":
+        stages.remove("detect_contiguous_blocks")
+    for stage in stages:
+        with timed_stage(records, stage, len(df)):
+            df = getattr(preprocessor, stage)(df)
+
+    with timed_stage(records, "calculate_rolling_std", len(df)):
+        df = StdevCalculator.from_config(config).calculate_rolling_std(df)
+    with timed_stage(records, "export_results", len(df)):
+        OutputWriter(config.output).write(df)
+
+    records.append(total_record(records, rows))
+    return records
+
+class StdevBenchmark(Benchmark):
+    """
+    Generates data for each size and times the pipeline on it.
+
+    Args:
+        config_path (Path): Project config.json; its settings (dtypes,
+            output type, ...) are reused, only the data and output paths and
+            the calculation range are replaced.
+        work_dir (Path): Directory for generated data and outputs.
+        securities (int): Number of security_ids in the generated data.
+        gap_frequency (float): Share of missing hourly snaps.
+        seed (int): Random seed for the generator.
+    """
+
+    project = "stdev_test"
+    pipeline = _run_pipeline
+
+    def __init__(self, config_path: Path, work_dir: Path, securities: int = 200,
+                 gap_frequency: float = 0.01, seed: int = 0):
+        super().__init__(config_path, work_dir)
+        self.securities = securities
+        self.gap_frequency = gap_frequency
+        self.seed = seed
+
+    def prepare(self, rows: int, regenerate: bool = False) -> Path:
+        size_dir = self.work_dir / f"rows_{rows}"
+        data_path = size_dir / "data" / "stdev_price_data.parq.gzip"
+        generator = StdevDataGenerator(rows, securities=self.securities,
+                                       gap_frequency=self.gap_frequency, seed=self.seed)
+        if regenerate or not data_path.exists():
+            generator.write(data_path)
+
+        with open(self.config_path) as f:
+            config = json.load(f)
+        params = config.setdefault("calculation_params", {})
+        date_format = params.get("date_format", "%Y-%m-%d %H:%M:%S")
+        lookback = pd.Timedelta(hours=max(spec["window"] for spec in params.get("rolling", DEFAULT_ROLLING)))
+        params["start_calc"] = (generator.start + lookback).strftime(date_format)
+        params["end_calc"] = generator.end.strftime(date_format)
+        config["data"]["stdev_file"] = {"path": "data/stdev_price_data.parq.gzip", "type": "parquet"}
+        config["output_file"]["path"] = Path(config["output_file"]["path"]).name
+        # Time the real parsing work, not parsed-input cache hits
+        config["cache"] = {"enabled": False}
+
+        config_path = size_dir / "config.json"
+        with open(config_path, "w") as f:
+            json.dump(config, f, indent=2)
+        return config_path
+
+    def params(self) -> Dict:
+        return {"securities": self.securities, "gap_frequency": self.gap_frequency, "seed": self.seed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the stdev_test pipeline on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Approximate row counts.")
+    parser.add_argument("--securities", type=int, default=200, help="Number of security_ids.")
+    parser.add_argument("--gap-frequency", type=float, default=0.01, help="Share of missing hourly snaps.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", type=Path, default=Path("config.json"))
+    parser.add_argument("--work-dir", type=Path, default=Path("benchmark"))
+    parser.add_argument("--output", type=Path, default=None, help="Results file (default: <work-dir>/results.json).")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate data that already exists.")
+    args = parser.parse_args()
+
+    benchmark = StdevBenchmark(args.config, args.work_dir, securities=args.securities,
+                               gap_frequency=args.gap_frequency, seed=args.seed)
+    report = benchmark.run(args.sizes, regenerate=args.regenerate)
+    write_report(report, args.output or args.work_dir / "results.json")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 import json
 from pathlib import Path
 
+# Rolling statistics computed when calculation_params has no 'rolling' list:
+# the 20-snap stdev of bid, mid and ask
+DEFAULT_ROLLING = [
+    {"window": 20, "stat": "stdev", "columns": ["bid", "mid", "ask"], "name": "{column}_stdev"},
+]
+
 class Config:
     def __init__(self, config_path: Path):
         config_path = config_path.resolve()
@@ -13,19 +19,69 @@ class Config:
         self.price = ConfigData(config["data"].get("price_file", {}), base_dir)
         self.spot = ConfigData(config["data"].get("spot_file", {}), base_dir)
         self.stdev = ConfigData(config["data"].get("stdev_file", {}), base_dir)
+        self.state = ConfigData(config["data"].get("state_file", {}), base_dir)
         self.output = ConfigData(config.get("output_file", {}), base_dir)
+        # Streaming rows lack the batch-only time_diff/contig_block columns, so
+        # they go to their own file, by default <output>_streaming<suffix>
+        streaming_output = config.get("streaming_output_file")
+        if streaming_output is None:
+            output_path = Path(config.get("output_file", {}).get("path", "results/output_stdev.csv"))
+            streaming_path = output_path.with_name(f"{output_path.stem}_streaming{output_path.suffix}")
+            streaming_output = {**config.get("output_file", {}), "path": str(streaming_path)}
+        self.streaming_output = ConfigData(streaming_output, base_dir)
+
+        self.dtypes = config.get("dtypes", {})
+        self.compact_dtypes = self.dtypes.get("compact", False)
+        self.float32_prices = self.dtypes.get("float32_prices", False)
+        self.memory_report = self.dtypes.get("memory_report", False)
+
+        self.metrics = config.get("metrics", {})
+        self.metrics_enabled = self.metrics.get("enabled", False)
+        self.metrics_path = base_dir / self.metrics.get("path", "metrics/metrics.json")
+        self.profile = self.metrics.get("profile", False)
+        self.profile_dir = base_dir / self.metrics.get("profile_dir", "metrics/profiles")
+        self.trace_memory = self.metrics.get("trace_memory", False)
+
+        self.cache = config.get("cache", {})
+        self.cache_enabled = self.cache.get("enabled", False)
+        self.cache_dir = base_dir / self.cache.get("path", "cache")
+        self.cache_max_bytes = int(self.cache.get("max_size_mb", 2048) * 2**20)
 
         self.calc_params = config.get("calculation_params", {})
         self.start_calc = self.calc_params.get("start_calc", "2021-11-20 00:00:00")
         self.end_calc = self.calc_params.get("end_calc", "2021-11-23 09:00:00")
         self.date_format = self.calc_params.get("date_format", "%Y-%m-%d %H:%M:%S")
         self.timestamp_col = self.calc_params.get("timestamp_col", "snap_time")
+        self.mode = self.calc_params.get("mode", "batch")
+        self.workers = self.calc_params.get("workers", 1)
+        # Compute only the start_calc..end_calc windows, a group of securities at
+        # a time, and write the results in batches instead of one frame
+        self.stream_output = self.calc_params.get("stream_output", False)
+        # (window, stat, columns) specs; windows count hourly snaps
+        self.rolling = self.calc_params.get("rolling", DEFAULT_ROLLING)
+        self.max_window = max(spec["window"] for spec in self.rolling)
+        # 'rows': windows of consecutive hourly snaps; 'time': windows of hours
+        self.window_mode = self.calc_params.get("window_mode", "rows")
+        self.max_gap = self.calc_params.get("max_gap", "1h")
+        self.min_periods = self.calc_params.get("min_periods")
+        # 'pandas', or 'polars' for one lazy multi-threaded query (scripts/polars_backend.py)
+        self.backend = self.calc_params.get("backend", "pandas")
+        if self.backend not in ("pandas", "polars"):
+            raise ValueError(f"Unsupported backend: {self.backend}")
+
+        # On-demand query service (scripts/query_service.py)
+        self.query = config.get("query", {})
+        self.query_host = self.query.get("host", "127.0.0.1")
+        self.query_port = self.query.get("port", 8766)
+        self.query_cache_max_bytes = int(self.query.get("cache_max_mb", 256) * 2**20)
 
 class ConfigData:
     def __init__(self, cfg: dict, base_dir: Path):
         self.path = base_dir / cfg.get("path", "")
         self.type = cfg.get("type", "csv")
         self.read_args = cfg.get("read_args", {})
+        self.write_args = cfg.get("write_args", {})
+        self.drop_columns = cfg.get("drop_columns", [])
 
     def __repr__(self):
         return f"ConfigData(path={self.path}, type={self.type}, read_args={self.read_args})"
\ No newline at end of file
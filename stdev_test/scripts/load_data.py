@@ -3,13 +3,29 @@ load_data.py
 
 This module contains functions and classes for loading
 data files required for the stdev price conversion pipeline.
+
+Only the columns used by the pipeline are read, and an optional snap_time
+range is pushed into the pyarrow dataset scan, so row groups whose
+statistics fall outside the range are never decompressed.
+
+With cache.enabled, the loaded frame (with parsed timestamps and compact
+dtypes) is stored in the parsed-input cache (shared/input_cache.py) and
+memory-mapped back on later runs with unchanged inputs and settings.
 """
 
+from typing import Optional, Tuple
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from scripts.project_root import add_project_root
 add_project_root()
 
 from scripts.config import Config
+from shared.compact_dtypes import compact_frame
+from shared.input_cache import InputCache
+from shared.instrumentation import instrument
 
 class StdevDataLoader:
     """
@@ -21,6 +37,8 @@ class StdevDataLoader:
     - Provide a simple data inspection method to check shape, columns, NaNs, and stats.
     """
 
+    columns = ['security_id', 'bid', 'mid', 'ask']
+
     def __init__(self, config: Config) -> None:
         """
         Initialize the loader with a config object.
@@ -29,18 +47,118 @@ class StdevDataLoader:
             config: Config object with file paths and read parameters.
         """
         self.config = config
+        self.cache = InputCache(config.cache_dir, config.cache_max_bytes) if config.cache_enabled else None
 
-    def load_data(self) -> pd.DataFrame:
+    @instrument("StdevDataLoader.load_data")
+    def load_data(self, time_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None) -> pd.DataFrame:
         """
         Load the stdev_price_data parquet file as a pandas DataFrame.
 
+        The filter on time_range is conservative for string timestamps; the
+        exact range is applied later by Preprocessor.filter_time_range.
+        With dtypes.compact, security_id is loaded as a categorical; with
+        dtypes.float32_prices, bid/mid/ask are narrowed to float32.
+
+        Args:
+            time_range (tuple[pd.Timestamp, pd.Timestamp], optional): Inclusive
+                snap_time range to read, e.g. Preprocessor.time_range(); either
+                bound may be None.
+
         Returns:
             pd.DataFrame: Loaded data with timestamps converted to datetime.
+                Frames served from the cache are memory-mapped and partly
+                read-only; the Preprocessor steps replace columns rather
+                than modifying them in place.
+        """
+        if self.cache is None:
+            return self._read(time_range)
+
+        file_cfg = self.config.stdev
+        params = {
+            "type": file_cfg.type,
+            "read_args": file_cfg.read_args,
+            "columns": [self.config.timestamp_col] + self.columns,
+            "date_format": self.config.date_format,
+            "compact": self.config.compact_dtypes,
+            "float32_prices": self.config.float32_prices,
+            "time_range": time_range,
+        }
+        key = self.cache.key(file_cfg.path, params)
+        df = self.cache.get(file_cfg.path, key)
+        if df is None:
+            df = self._read(time_range)
+            self.cache.put(file_cfg.path, key, df)
+        return df
+
+    def _read(self, time_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None) -> pd.DataFrame:
+        """
+        Read the stdev file, parse its timestamps and apply the compact dtypes.
         """
         file_cfg = self.config.stdev
         if file_cfg.type == "parquet":
-            df = pd.read_parquet(file_cfg.path, **file_cfg.read_args)
+            read_args = dict(file_cfg.read_args)
+            read_args.setdefault("columns", [self.config.timestamp_col] + self.columns)
+            if time_range is not None and "filters" not in read_args:
+                schema = pq.read_schema(file_cfg.path)
+                time_filter = time_range_filter(schema, self.config.timestamp_col, time_range, self.config.date_format)
+                if time_filter is not None:
+                    read_args["filters"] = time_filter
+            df = pd.read_parquet(file_cfg.path, **read_args)
         else:
             raise NotImplementedError("Only parquet files supported for stdev data.")
 
-        return df
\ No newline at end of file
+        # Parsed here so cached frames already hold datetimes
+        time_col = self.config.timestamp_col
+        df[time_col] = pd.to_datetime(df[time_col], format=self.config.date_format)
+
+        category_cols = ['security_id'] if self.config.compact_dtypes else []
+        float32_cols = ['bid', 'mid', 'ask'] if self.config.float32_prices else []
+        return compact_frame(df, category_cols, float32_cols)
+
+def time_range_filter(schema: pa.Schema, column: str, time_range: Tuple[pd.Timestamp, pd.Timestamp],
+                      timestamp_format: str) -> Optional[pc.Expression]:
+    """
+    Build a pyarrow dataset filter selecting an inclusive timestamp range.
+
+    Timestamp columns are compared directly. String columns are compared as
+    formatted strings, which only orders correctly for zero-padded formats
+    starting with '%Y-%m-%d'; for any other column type or format no filter
+    is returned and the caller must filter after loading.
+
+    Args:
+        schema (pa.Schema): Schema of the parquet file.
+        column (str): Timestamp column name.
+        time_range (tuple[pd.Timestamp, pd.Timestamp]): Inclusive (start, end);
+            either bound may be None for an open-ended range.
+        timestamp_format (str): strftime format of string timestamps.
+
+    Returns:
+        pc.Expression | None: Filter expression, or None if it cannot be pushed down.
+    """
+    index = schema.get_field_index(column)
+    if index < 0:
+        return None
+
+    field_type = schema.field(index).type
+    start, end = time_range
+    if pa.types.is_timestamp(field_type):
+        low = None if start is None else pa.scalar(start.to_datetime64(), field_type)
+        high = None if end is None else pa.scalar(end.to_datetime64(), field_type)
+    elif (pa.types.is_string(field_type) or pa.types.is_large_string(field_type)) \
+            and timestamp_format.startswith("%Y-%m-%d"):
+        # Bounds are formatted to whole seconds: a string is a prefix of the
+        # same time with fractional digits, so the range stays inclusive
+        second_format = timestamp_format[:-len(".%f")] if timestamp_format.endswith(".%f") else timestamp_format
+        low = None if start is None else start.floor("s").strftime(second_format)
+        high = None if end is None else (end.floor("s") + pd.Timedelta(seconds=1)).strftime(second_format)
+    else:
+        return None
+
+    bounds = []
+    if low is not None:
+        bounds.append(pc.field(column) >= low)
+    if high is not None:
+        bounds.append(pc.field(column) <= high)
+    if not bounds:
+        return None
+    return bounds[0] if len(bounds) == 1 else bounds[0] & bounds[1]
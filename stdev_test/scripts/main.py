@@ -1,51 +1,118 @@
 from pathlib import Path
 import sys
 import pandas as pd
-import time
 
 # Añadir root del proyecto al path para importar scripts
 current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent
 sys.path.insert(0, str(project_root))
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(project_root.parent))
 
 from scripts.config import Config
 from scripts.load_data import StdevDataLoader
+from scripts.parallel_stdev import ParallelStdevRunner
+from scripts.polars_backend import PolarsStdevCalculator
 from scripts.preprocessing import Preprocessor
 from scripts.stdev_calculator import StdevCalculator
+from scripts.streaming_stdev import StreamingStdevCalculator
+from shared.compact_dtypes import memory_report
+from shared.instrumentation import metrics
+from shared.output_writer import OutputWriter
 
 def main():
 
-    # Uncomment to measure time elapsed
-    start_time = time.perf_counter()
-
     # Load config
     config = Config(Path("config.json"))
 
-    # Load data
-    loader = StdevDataLoader(config)
-    df_raw = loader.load_data()
+    # Record wall/CPU time, rows and memory of every pipeline stage
+    metrics.configure(
+        enabled=config.metrics_enabled,
+        path=config.metrics_path,
+        profile_dir=config.profile_dir if config.profile else None,
+        trace_memory=config.trace_memory,
+    )
 
-    # Preprocess data
     preprocessor = Preprocessor(config)
-    df_preprocessed = preprocessor.preprocess(df_raw)
 
-    # Calcular rolling std
-    calculator = StdevCalculator(window_size=20)
-    df_result = calculator.calculate_rolling_std(df_preprocessed)
+    if config.mode == "streaming":
+        # Only snaps newer than the persisted state are processed
+        if config.backend == "polars":
+            raise ValueError("The polars backend supports batch mode only")
+        if config.window_mode != "rows":
+            raise ValueError("Streaming mode supports window_mode 'rows' only")
+        window_size = StreamingStdevCalculator.window_from_specs(config.rolling)
+        resuming = config.state.path.exists()
+        calculator = StreamingStdevCalculator.load_state(config.state.path, window_size=window_size)
+
+    # Load data; batch runs only read the snaps needed for start_calc..end_calc,
+    # streaming runs the snaps from the persisted state onwards (the polars
+    # backend scans the file itself)
+    if config.backend == "pandas":
+        loader = StdevDataLoader(config)
+        time_range = calculator.resume_range() if config.mode == "streaming" else preprocessor.time_range()
+        df_raw = loader.load_data(time_range=time_range)
 
-    # Filter final range (from start_calc to end_calc)
+    # Preprocess data
     start_result = pd.to_datetime(config.start_calc)
     end_result = pd.to_datetime(config.end_calc)
-    df_final = df_result[(df_result['snap_time'] >= start_result) & (df_result['snap_time'] <= end_result)].copy()
 
-    # Save result
-    output_cfg = config.output
-    df_final.to_csv(output_cfg.path, index=False, **output_cfg.read_args)
+    if config.mode == "streaming":
+        df_sorted = preprocessor.sort_data(preprocessor.convert_timestamps(df_raw))
+        df_result = calculator.update(df_sorted, time_col=config.timestamp_col)
+
+        df_final = df_result[(df_result['snap_time'] >= start_result) & (df_result['snap_time'] <= end_result)]
+
+        # Append new rows to the streaming output (a fresh state starts it over),
+        # then persist the state
+        OutputWriter(config.streaming_output, append=resuming).write(df_final)
+        calculator.save_state(config.state.path)
+    elif config.stream_output:
+        # Evaluate only the windows ending in start_calc..end_calc, by groups of
+        # securities, and write them in batches. Only the result is streamed: the
+        # loaded and preprocessed frames still hold the whole range plus lookback.
+        if config.backend != "pandas" or config.workers > 1:
+            raise ValueError("stream_output supports the serial pandas backend only")
+        df_preprocessed = preprocessor.preprocess(df_raw)
+        calculator = StdevCalculator.from_config(config)
+        # Write each group as it is computed, so at most about one group is buffered
+        batch_rows = 100_000
+        OutputWriter(config.output).write_stream(
+            calculator.iter_results(df_preprocessed, start_result, end_result, batch_rows=batch_rows),
+            buffer_rows=batch_rows)
+
+        if config.memory_report:
+            print(memory_report({"raw": df_raw, "preprocessed": df_preprocessed}).to_string())
+    else:
+        if config.backend == "polars":
+            # Lazy scan, preprocessing and rolling stats as one multi-threaded polars query
+            df_result = PolarsStdevCalculator(config).calculate_rolling_std()
+        elif config.workers > 1:
+            # Preprocess and calculate security_id shards in worker processes
+            runner = ParallelStdevRunner(config, workers=config.workers)
+            df_result = runner.run(df_raw)
+        else:
+            df_preprocessed = preprocessor.preprocess(df_raw)
+
+            # Calcular rolling std (and the other configured rolling stats)
+            calculator = StdevCalculator.from_config(config)
+            df_result = calculator.calculate_rolling_std(df_preprocessed)
+
+        # Filter final range (from start_calc to end_calc)
+        df_final = df_result[(df_result['snap_time'] >= start_result) & (df_result['snap_time'] <= end_result)].copy()
+
+        # Save result
+        OutputWriter(config.output).write(df_final)
+
+        if config.memory_report:
+            frames = {"raw": df_raw} if config.backend == "pandas" else {}
+            frames.update({"result": df_result, "final": df_final})
+            print(memory_report(frames).to_string())
 
-    # Uncomment to measure time elapsed
-    end_time = time.perf_counter()
-    elapsed = end_time - start_time
-    print(f"Total execution time: {elapsed:.3f} seconds")
+    metrics_path = metrics.write()
+    if metrics_path is not None:
+        print(metrics.summary().to_string())
+        print(f"Metrics written to {metrics_path}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+parallel_stdev.py
+
+Runs the Preprocessor + StdevCalculator chain in parallel across security_id shards.
+
+Securities are fully independent, so the sorted security_ids are split
+into contiguous ranges holding about the same number of rows, and each
+shard is preprocessed and computed in its own worker process. Shards travel
+between processes as Arrow IPC streams written into shared memory blocks,
+so workers map the data instead of unpickling DataFrames. Every shard
+result is sorted by (security_id, snap_time) and covers its own range of
+securities, so concatenating the results in shard order gives the
+single-process output, including the global contig_block numbering.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from scripts.preprocessing import Preprocessor
+from scripts.stdev_calculator import StdevCalculator
+from shared.instrumentation import instrument
+
+def _write_shared(df: pd.DataFrame) -> Tuple[str, int]:
+    """
+    Serialize a DataFrame as an Arrow IPC stream into a new shared memory block.
+
+    The caller owns the block and must unlink it once it has been read.
+
+    Args:
+        df (pd.DataFrame): Frame to share.
+
+    Returns:
+        tuple[str, int]: Shared memory name and payload size in bytes.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # Measure the stream first so it can be written straight into the block
+    mock = pa.MockOutputStream()
+    with pa.ipc.new_stream(mock, table.schema) as writer:
+        writer.write_table(table)
+    size = mock.size()
+
+    shm = SharedMemory(create=True, size=max(size, 1))
+    try:
+        _write_ipc(table, shm.buf)
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    return shm.name, size
+
+def _read_shared(name: str, size: int) -> pd.DataFrame:
+    """
+    Read a DataFrame back from a shared memory block written by _write_shared.
+
+    Args:
+        name (str): Shared memory name.
+        size (int): Payload size in bytes.
+
+    Returns:
+        pd.DataFrame: The shared frame.
+    """
+    shm = SharedMemory(name=name)
+    try:
+        df = _read_ipc(shm.buf, size)
+    finally:
+        shm.close()
+    return df
+
+# The IPC helpers keep every Arrow view of the shared block local, so the
+# views are released when they return and the block can be closed.
+
+def _write_ipc(table: pa.Table, memory: memoryview) -> None:
+    with pa.ipc.new_stream(pa.FixedSizeBufferWriter(pa.py_buffer(memory)), table.schema) as writer:
+        writer.write_table(table)
+
+def _read_ipc(memory: memoryview, size: int) -> pd.DataFrame:
+    df = pa.ipc.open_stream(pa.py_buffer(memory)[:size]).read_all().to_pandas()
+    # Categorical codes are zero-copy views of the block; detach them
+    for name in df.columns[df.dtypes == 'category']:
+        df[name] = df[name].copy()
+    return df
+
+def _unlink_shared(name: str) -> None:
+    """Release a shared memory block, ignoring blocks that are already gone."""
+    try:
+        SharedMemory(name=name).unlink()
+    except FileNotFoundError:
+        pass
+
+def _process_shard(config, name: str, size: int) -> Tuple[str, int]:
+    """
+    Worker entry point: preprocess and compute one shard.
+
+    Args:
+        config (Config): Config object with the calculation parameters and rolling specs.
+        name (str): Shared memory block holding the raw shard.
+        size (int): Payload size of the raw shard.
+
+    Returns:
+        tuple[str, int]: Shared memory block holding the shard result.
+    """
+    df = _read_shared(name, size)
+    df = Preprocessor(config).preprocess(df)
+    result = StdevCalculator.from_config(config).calculate_rolling_std(df)
+    return _write_shared(result)
+
+class ParallelStdevRunner:
+    """
+    Range-partitions security_ids across a process pool and merges the results.
+
+    Args:
+        config (Config): Config object with calculation parameters and rolling specs.
+        workers (int): Number of worker processes (and shards).
+    """
+
+    def __init__(self, config, workers: int = 2):
+        self.config = config
+        self.workers = workers
+
+    def partition(self, df: pd.DataFrame) -> List[pd.DataFrame]:
+        """
+        Split raw data into one shard per worker by ranges of security_id.
+
+        Securities are taken in the order Preprocessor.sort_data sorts them
+        (category order for categorical ids, missing ids last) and cut into
+        contiguous ranges of about len(df) / workers rows.
+
+        Args:
+            df (pd.DataFrame): Raw stdev price data.
+
+        Returns:
+            list[pd.DataFrame]: Shards in security_id order; every security
+                lands in exactly one.
+        """
+        counts = df['security_id'].value_counts(sort=False)
+        counts = counts[counts > 0].sort_index()
+        rows_before = counts.cumsum().to_numpy() - counts.to_numpy()
+        shard_of = np.minimum(rows_before * self.workers // max(len(df), 1), self.workers - 1)
+        # Rows without a security_id (position -1) go last, as sort_data puts them
+        shard_of = np.append(shard_of, self.workers - 1)
+        shard_ids = shard_of[counts.index.get_indexer(df['security_id'])]
+        return [df[shard_ids == i] for i in range(self.workers)]
+
+    @instrument("ParallelStdevRunner.run")
+    def run(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Preprocess and compute rolling stdevs for all securities in parallel.
+
+        Args:
+            df (pd.DataFrame): Raw stdev price data, as returned by StdevDataLoader.
+
+        Returns:
+            pd.DataFrame: Same rows, order and columns as
+                StdevCalculator.from_config(config).calculate_rolling_std(Preprocessor.preprocess(df)).
+        """
+        inputs = [_write_shared(shard) for shard in self.partition(df)]
+        outputs = []
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [
+                    pool.submit(_process_shard, self.config, name, size)
+                    for name, size in inputs
+                ]
+                # Wait for every shard before raising, so all output blocks get unlinked
+                errors = []
+                for future in futures:
+                    try:
+                        outputs.append(future.result())
+                    except Exception as exc:
+                        errors.append(exc)
+                if errors:
+                    raise errors[0]
+            # Shards hold consecutive security ranges, each already in serial order
+            result = pd.concat([_read_shared(name, size) for name, size in outputs], ignore_index=True)
+        finally:
+            for name, _ in inputs + outputs:
+                _unlink_shared(name)
+
+        # Shards carry their own categories; restore the input's categorical dtype
+        if isinstance(df['security_id'].dtype, pd.CategoricalDtype):
+            result['security_id'] = result['security_id'].astype(df['security_id'].dtype)
+
+        # contig_block ids are numbered per shard; renumber them globally
+        if 'contig_block' in result.columns:
+            result['contig_block'] = (result['time_diff'] != pd.Timedelta(hours=1)).cumsum()
+        return result
@@ -0,0 +1,122 @@
+"""
+polars_backend.py
+
+Polars implementation of the Preprocessor + StdevCalculator chain, selected
+with calculation_params.backend = "polars" in config.json.
+
+The stdev file is scanned lazily with the snap_time range filter applied at
+scan time, and preprocessing and every rolling statistic are expressed as
+one polars query over windows partitioned by (security_id, contig_block),
+so polars can optimize and run it on all cores. In time mode the windows
+are time-based rolling windows partitioned by security_id and by the
+segments between gaps longer than max_gap.
+
+The result has the same rows, order, columns and values (up to floating
+point rounding of the rolling kernels) as the pandas pipeline. polars is
+an optional dependency (see shared/polars_backend.py).
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+from scripts.preprocessing import Preprocessor
+from scripts.stdev_calculator import StdevCalculator
+from shared.instrumentation import instrument
+from shared.polars_backend import parse_timestamps, pl, scan
+
+class PolarsStdevCalculator:
+    """
+    Lazy polars counterpart of Preprocessor.preprocess + StdevCalculator.calculate_rolling_std.
+
+    Args:
+        config (Config): Config object with the input file, calculation
+            parameters and rolling specs.
+    """
+
+    price_cols = StdevCalculator.price_cols
+
+    def __init__(self, config):
+        if pl is None:
+            raise ImportError("The polars backend requires polars: pip install polars")
+        self.config = config
+        self.specs = StdevCalculator.expand_specs(config.rolling)
+
+    def scan(self) -> "pl.LazyFrame":
+        """
+        Lazily scan the stdev file and preprocess it: parse snap_time, keep
+        the calculation range plus lookback, sort and number contiguous blocks.
+        """
+        time_col = self.config.timestamp_col
+        lf = parse_timestamps(scan(self.config.stdev, [time_col, 'security_id'] + self.price_cols),
+                              time_col, self.config.date_format)
+        if self.config.float32_prices:
+            lf = lf.with_columns(pl.col(self.price_cols).cast(pl.Float32))
+
+        start_window, end_calc = Preprocessor(self.config).time_range()
+        lf = lf.filter(pl.col(time_col).is_between(start_window, end_calc)).sort(['security_id', time_col])
+        if self.config.window_mode == "time":
+            return lf
+
+        time_diff = pl.col(time_col).diff().over('security_id')
+        return lf.with_columns(time_diff.alias('time_diff')).with_columns(
+            (pl.col('time_diff') != pd.Timedelta(hours=1).to_pytimedelta())
+            .fill_null(True).cum_sum().cast(pl.Int64).alias('contig_block')
+        )
+
+    def rolling_exprs(self) -> list:
+        """
+        One expression per (window, stat, column) spec, in spec order.
+        """
+        time_mode = self.config.window_mode == "time"
+        partition = ['security_id', '_segment'] if time_mode else StdevCalculator.group_cols
+        exprs = []
+        for window, stat, column, name in self.specs:
+            values = pl.col(column).cast(pl.Float64)
+            if time_mode:
+                kwargs = dict(by=self.config.timestamp_col, window_size=f"{window}h", closed="right")
+            else:
+                kwargs = dict(window_size=window, min_samples=window)
+
+            def rolling(op: str) -> "pl.Expr":
+                return getattr(values, f"rolling_{op}_by" if time_mode else f"rolling_{op}")(**kwargs)
+
+            if stat == 'zscore':
+                # Flat windows have a zero stdev in StdevCalculator, so no zscore
+                expr = pl.when(rolling('max') > rolling('min')).then((values - rolling('mean')) / rolling('std'))
+            else:
+                expr = rolling({'stdev': 'std'}.get(stat, stat))
+            if time_mode:
+                # As in StdevCalculator: min_periods counts snaps, and a null (NaN) price nulls its windows
+                snaps = pl.col(self.config.timestamp_col).is_not_null().cast(pl.Int64).rolling_sum_by(**kwargs)
+                nulls = values.is_null().cast(pl.Int64).rolling_sum_by(**kwargs)
+                expr = pl.when((snaps >= (self.config.min_periods or window)) & (nulls == 0)).then(expr)
+            exprs.append(expr.over(partition).cast(self._dtype(column)).alias(name))
+        return exprs
+
+    def _dtype(self, column: str) -> "pl.DataType":
+        """Output dtype of a stat: the price dtype, as in StdevCalculator."""
+        return pl.Float32 if self.config.float32_prices and column in self.price_cols else pl.Float64
+
+    @instrument("PolarsStdevCalculator.calculate_rolling_std")
+    def calculate_rolling_std(self, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Preprocess and compute the rolling statistics.
+
+        Args:
+            df (pd.DataFrame, optional): Preprocessed frame to compute on, as for
+                StdevCalculator; by default the stdev file is scanned and preprocessed.
+
+        Returns:
+            pd.DataFrame: Same rows, order and columns as the pandas pipeline.
+        """
+        lf = self.scan() if df is None else pl.from_pandas(df).lazy()
+        if self.config.window_mode == "time":
+            time_col = self.config.timestamp_col
+            gap = pl.col(time_col).diff().over('security_id')
+            breaks = gap.is_null()
+            if self.config.max_gap is not None:
+                breaks = breaks | (gap > pd.Timedelta(self.config.max_gap).to_pytimedelta())
+            lf = lf.with_columns(breaks.cum_sum().alias('_segment'))
+            return lf.with_columns(self.rolling_exprs()).drop('_segment').collect().to_pandas()
+        return lf.with_columns(self.rolling_exprs()).collect().to_pandas()
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from shared.instrumentation import instrument
+
 class Preprocessor:
     """
     Class responsible for preprocessing raw stdev price data to prepare it
@@ -21,26 +23,42 @@ class Preprocessor:
             config: Config object containing parameters such as date format and ranges.
         """
         self.config = config
+        # Windows count hourly snaps, so the largest window sets the lookback
+        self.lookback = pd.Timedelta(hours=config.max_window)
 
+    @instrument("Preprocessor.convert_timestamps")
     def convert_timestamps(self, df: pd.DataFrame) -> pd.DataFrame:
         time_col = self.config.timestamp_col
         df[time_col] = pd.to_datetime(df[time_col], format=self.config.date_format)
         return df
 
+    @instrument("Preprocessor.sort_data")
     def sort_data(self, df: pd.DataFrame) -> pd.DataFrame:
         time_col = self.config.timestamp_col
         return df.sort_values(['security_id', time_col]).reset_index(drop=True)
 
-    def filter_time_range(self, df: pd.DataFrame) -> pd.DataFrame:
-        time_col = self.config.timestamp_col
+    def time_range(self) -> tuple:
+        """
+        Inclusive range of snaps needed for the calculation: from one lookback
+        before start_calc, so the first windows are complete, to end_calc.
+
+        Returns:
+            tuple[pd.Timestamp, pd.Timestamp]: (start_window, end_calc).
+        """
         start_calc = pd.to_datetime(self.config.start_calc)
         end_calc = pd.to_datetime(self.config.end_calc)
-        start_window = start_calc - pd.Timedelta(hours=20)
+        return start_calc - self.lookback, end_calc
+
+    @instrument("Preprocessor.filter_time_range")
+    def filter_time_range(self, df: pd.DataFrame) -> pd.DataFrame:
+        time_col = self.config.timestamp_col
+        start_window, end_calc = self.time_range()
         return df[(df[time_col] >= start_window) & (df[time_col] <= end_calc)].copy()
 
+    @instrument("Preprocessor.detect_contiguous_blocks")
     def detect_contiguous_blocks(self, df: pd.DataFrame) -> pd.DataFrame:
         time_col = self.config.timestamp_col
-        df['time_diff'] = df.groupby('security_id')[time_col].diff()
+        df['time_diff'] = df.groupby('security_id', observed=True)[time_col].diff()
         df['contig_block'] = (df['time_diff'] != pd.Timedelta(hours=1)).cumsum()
         return df
 
@@ -49,5 +67,7 @@ class Preprocessor:
         df = self.convert_timestamps(df)
         df = self.sort_data(df)
         df = self.filter_time_range(df)
-        df = self.detect_contiguous_blocks(df)
+        # Time windows are bounded by snap times, not by contiguous blocks
+        if self.config.window_mode != "time":
+            df = self.detect_contiguous_blocks(df)
         return df
\ No newline at end of file
@@ -9,9 +9,12 @@ from pathlib import Path
 
 def add_project_root() -> None:
     """
-    Adds the root of the project (the directory containing 'scripts/') to sys.path.
+    Adds the root of the project (the directory containing 'scripts/') to sys.path,
+    and the repository root (the directory containing 'shared/') after it.
     """
     current_file = Path(__file__).resolve()
     project_root = current_file.parent.parent  # Goes from scripts/ to rate_test/
     if str(project_root) not in sys.path:
-        sys.path.insert(0, str(project_root))
\ No newline at end of file
+        sys.path.insert(0, str(project_root))
+    if str(project_root.parent) not in sys.path:
+        sys.path.insert(1, str(project_root.parent))
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""
+query_service.py
+
+On-demand rolling statistics for one security and snap_time range.
+
+StdevQueryService loads the stdev price history once, sorted by
+(security_id, snap_time) with its contiguous blocks, and keeps the row
+bounds of every security as a time index. A query only slices the
+requested security and runs StdevCalculator.iter_results on it, so only the
+windows ending in the range (plus their lookback) are evaluated. Results
+are kept in an LRU cache bounded by memory and keyed by (security_id,
+window, start, end), with hit/miss statistics.
+
+The statistics are the configured calculation_params.rolling specs, or the
+stdev of bid, mid and ask over another window when a query passes one.
+
+Query from Python:
+    service = StdevQueryService(Config(Path("config.json")))
+    df = service.query("SEC_1", "2021-11-20 00:00:00", "2021-11-21 00:00:00", window=20)
+
+or from the command line, run from the stdev_test directory:
+    python scripts/query_service.py query SEC_1 "2021-11-20 00:00:00" "2021-11-21 00:00:00"
+    python scripts/query_service.py serve
+
+The server answers HTTP GET requests on query.host:query.port with JSON:
+    /stdev?security_id=SEC_1&start=2021-11-20T00:00:00&end=2021-11-21T00:00:00&window=20
+    /stats
+"""
+
+import argparse
+import json
+import sys
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+# Add project root to sys.path
+current_file = Path(__file__).resolve()
+project_root = current_file.parent.parent
+sys.path.insert(0, str(project_root))
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(project_root.parent))
+
+from scripts.config import Config
+from scripts.load_data import StdevDataLoader
+from scripts.preprocessing import Preprocessor
+from scripts.stdev_calculator import StdevCalculator
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of result frames, bounded by their total memory.
+
+    Args:
+        max_bytes (int): Largest total deep memory usage of the cached frames.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[pd.DataFrame]:
+        """Cached frame of key, marked as most recently used, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, df: pd.DataFrame) -> None:
+        """Cache a frame, evicting the least recently used ones over max_bytes."""
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        """Hits, misses, hit rate, evictions, entries and cached bytes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+class StdevQueryService:
+    """
+    Rolling statistics of one security over a snap_time range, on demand.
+
+    Args:
+        config (Config): Config object with the input file, calculation
+            parameters, rolling specs and query settings.
+        df (pd.DataFrame, optional): Stdev price history to serve; loaded from
+            the configured file by default.
+    """
+
+    helper_cols = ['time_diff', 'contig_block']
+
+    def __init__(self, config: Config, df: Optional[pd.DataFrame] = None):
+        self.config = config
+        self.cache = ResultCache(config.query_cache_max_bytes)
+        self._calculators: Dict[Optional[int], StdevCalculator] = {None: StdevCalculator.from_config(config)}
+        self._lock = threading.Lock()
+
+        self.history = self._prepare(StdevDataLoader(config).load_data() if df is None else df)
+        self.index = self._build_index(self.history)
+
+    def _prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Sort the whole history by (security_id, snap_time) and number its contiguous blocks."""
+        preprocessor = Preprocessor(self.config)
+        df = preprocessor.sort_data(preprocessor.convert_timestamps(df))
+        if self.config.window_mode != "time":
+            df = preprocessor.detect_contiguous_blocks(df)
+        return df
+
+    @staticmethod
+    def _build_index(df: pd.DataFrame) -> Dict[str, Tuple[int, int]]:
+        """Row bounds [start, stop) of every security in the sorted history."""
+        codes, securities = pd.factorize(df['security_id'], sort=False)
+        starts = np.flatnonzero(np.diff(codes, prepend=-2) != 0)
+        stops = np.append(starts[1:], len(df))
+        return {str(securities[codes[start]]): (int(start), int(stop))
+                for start, stop in zip(starts, stops) if codes[start] >= 0}
+
+    def calculator(self, window: Optional[int] = None) -> StdevCalculator:
+        """
+        Calculator of the configured specs, or of the bid/mid/ask stdev over window.
+        """
+        with self._lock:
+            if window not in self._calculators:
+                specs = [{"window": window, "stat": "stdev", "columns": StdevCalculator.price_cols,
+                          "name": "{column}_stdev"}]
+                self._calculators[window] = StdevCalculator(
+                    window_size=window, specs=specs, window_mode=self.config.window_mode,
+                    max_gap=self.config.max_gap, min_periods=self.config.min_periods,
+                    time_col=self.config.timestamp_col)
+            return self._calculators[window]
+
+    def query(self, security_id: str, start, end, window: Optional[int] = None) -> pd.DataFrame:
+        """
+        Rolling statistics of one security's snaps in [start, end].
+
+        Args:
+            security_id (str): Security to compute.
+            start (str | pd.Timestamp): First snap_time of the result.
+            end (str | pd.Timestamp): Last snap_time of the result.
+            window (int, optional): Stdev window in snaps (hours in time mode);
+                None computes the configured rolling specs.
+
+        Returns:
+            pd.DataFrame: The rows and values the batch pipeline writes for this
+                security and range, without the time_diff and contig_block
+                helper columns.
+
+        Raises:
+            KeyError: If security_id is not in the history.
+            ValueError: If start is after end or window is not positive.
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        if start > end:
+            raise ValueError(f"start {start} is after end {end}")
+        if window is not None and int(window) < 1:
+            raise ValueError(f"Rolling window must be positive, got {window}")
+        window = None if window is None else int(window)
+        if security_id not in self.index:
+            raise KeyError(f"Unknown security_id: {security_id}")
+
+        key = (security_id, window, start, end)
+        result = self.cache.get(key)
+        if result is None:
+            lo, hi = self.index[security_id]
+            frames = self.calculator(window).iter_results(self.history.iloc[lo:hi], start, end)
+            result = pd.concat(list(frames), ignore_index=True)
+            result = result.drop(columns=[c for c in self.helper_cols if c in result.columns])
+            self.cache.put(key, result)
+        # Callers get their own copy, so the cached frame stays unchanged
+        return result.copy()
+
+    def serve(self, host: str, port: int) -> None:
+        """
+        Answer HTTP GET /stdev and /stats requests until interrupted.
+        """
+        server = ThreadingHTTPServer((host, port), _handler(self))
+        print(f"Serving stdev queries on http://{host}:{server.server_port}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+def _handler(service: StdevQueryService):
+    """Request handler class bound to a service."""
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            if url.path == "/stats":
+                return self._send(HTTPStatus.OK, service.cache.stats())
+            if url.path != "/stdev":
+                return self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {url.path}"})
+            missing = [name for name in ("security_id", "start", "end") if name not in params]
+            if missing:
+                return self._send(HTTPStatus.BAD_REQUEST, {"error": f"Missing parameters: {', '.join(missing)}"})
+            try:
+                df = service.query(params["security_id"], params["start"], params["end"],
+                                   window=params.get("window"))
+            except KeyError as exc:
+                return self._send(HTTPStatus.NOT_FOUND, {"error": exc.args[0]})
+            except ValueError as exc:
+                return self._send(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return self._send(HTTPStatus.OK, df.to_json(orient="records", date_format="iso"))
+
+        def _send(self, status: HTTPStatus, payload) -> None:
+            body = (payload if isinstance(payload, str) else json.dumps(payload)).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return QueryHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="Query rolling stdevs of one security and snap_time range.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    query = subparsers.add_parser("query", help="Print the result of one query.")
+    query.add_argument("security_id")
+    query.add_argument("start")
+    query.add_argument("end")
+    query.add_argument("--window", type=int, default=None, help="Stdev window (default: the configured specs).")
+    serve = subparsers.add_parser("serve", help="Serve queries over HTTP.")
+    serve.add_argument("--host", default=None, help="Default: query.host.")
+    serve.add_argument("--port", type=int, default=None, help="Default: query.port.")
+    parser.add_argument("--config", type=Path, default=Path("config.json"))
+    args = parser.parse_args()
+
+    config = Config(args.config)
+    service = StdevQueryService(config)
+    if args.command == "query":
+        print(service.query(args.security_id, args.start, args.end, window=args.window).to_string(index=False))
+    else:
+        service.serve(args.host or config.query_host, args.port if args.port is not None else config.query_port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+streaming_stdev.py
+
+Incremental rolling standard deviation for hourly stdev price snaps.
+
+Instead of recomputing the full history every run, the calculator keeps a
+fixed-size ring buffer plus Welford running mean / sum of squared deviations
+for each security_id. Every new snap updates that state in O(1), and the
+state is persisted to disk between runs so each update only costs the
+number of new rows. Resumed runs load only the snaps from resume_range()
+onwards, so reading the input does not grow with the history either.
+"""
+
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.stdev_calculator import StdevCalculator
+from shared.instrumentation import instrument
+
+class StreamingStdevCalculator(StdevCalculator):
+    """
+    Rolling bid/mid/ask standard deviation updated one snap at a time.
+
+    A gap (any step between consecutive snaps of a security that is not
+    exactly one hour) resets the security's state, matching the block
+    splitting of Preprocessor.detect_contiguous_blocks. A window containing
+    a NaN price yields NaN, as with rolling(min_periods=window_size).
+
+    State per security slot:
+        - last_time: last processed snap_time (int64 ns, NaT if unseen)
+        - pos: next write position in the ring buffer
+        - filled: number of snaps in the current window (<= window_size)
+        - buffer: last window_size values per price column
+        - n, mean, m2: Welford count, mean and sum of squared deviations
+          over the non-NaN values of the window, per price column
+        - same: length of the current run of identical values per price
+          column; a window made of one repeated value is reported as exactly
+          0 and re-anchors mean/m2, as pandas' rolling variance does
+    """
+
+    gap = pd.Timedelta(hours=1)
+
+    def __init__(self, window_size: int = 20):
+        """
+        Initialize an empty streaming state.
+
+        Args:
+            window_size (int): Size of rolling window in hours.
+        """
+        super().__init__(window_size=window_size)
+        n_cols = len(self.price_cols)
+        self.slots = {}
+        self.last_time = np.empty(0, dtype=np.int64)
+        self.pos = np.empty(0, dtype=np.int64)
+        self.filled = np.empty(0, dtype=np.int64)
+        self.buffer = np.empty((0, window_size, n_cols))
+        self.n = np.empty((0, n_cols), dtype=np.int64)
+        self.mean = np.empty((0, n_cols))
+        self.m2 = np.empty((0, n_cols))
+        self.same = np.empty((0, n_cols), dtype=np.int64)
+
+    @instrument("StreamingStdevCalculator.update")
+    def update(self, df: pd.DataFrame, time_col: str = 'snap_time') -> pd.DataFrame:
+        """
+        Feed new snaps into the state and return their rolling stdevs.
+
+        Rows at or before the last processed snap of their security are
+        treated as already seen and skipped, so re-feeding an overlapping
+        history is safe.
+
+        Args:
+            df (pd.DataFrame): Snaps with time_col already parsed to datetime,
+                'security_id' and the bid/mid/ask columns.
+            time_col (str): Name of the snap timestamp column.
+
+        Returns:
+            pd.DataFrame: The new rows sorted by (security_id, time_col) with added
+                'bid_stdev', 'mid_stdev' and 'ask_stdev' columns.
+        """
+        out_cols = [time_col, 'security_id'] + self.price_cols
+        df = df[out_cols].sort_values(['security_id', time_col], kind='stable').reset_index(drop=True)
+
+        slots = self._slots_for(df['security_id'].to_numpy())
+        times = df[time_col].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        fresh = times > self.last_time[slots]
+        df = df[fresh].reset_index(drop=True)
+        slots, times = slots[fresh], times[fresh]
+        values = df[self.price_cols].to_numpy(dtype=np.float64)
+
+        stdevs = np.full(values.shape, np.nan)
+        if len(df) == 0:
+            return df.assign(**{f'{col}_stdev': stdevs[:, i] for i, col in enumerate(self.price_cols)})
+
+        # Rows are sorted by security, so round k holds the k-th new snap of
+        # every security and no slot appears twice within a round.
+        idx = np.arange(len(slots))
+        starts = np.r_[True, slots[1:] != slots[:-1]]
+        rank = idx - np.maximum.accumulate(np.where(starts, idx, 0))
+        for r in range(int(rank.max()) + 1):
+            rows = np.flatnonzero(rank == r)
+            stdevs[rows] = self._step(slots[rows], times[rows], values[rows])
+
+        for i, col in enumerate(self.price_cols):
+            df[f'{col}_stdev'] = stdevs[:, i]
+        return df
+
+    def _slots_for(self, security_ids: np.ndarray) -> np.ndarray:
+        """
+        Map security ids to state slots, allocating empty slots for new ids.
+        """
+        new_ids = [sid for sid in pd.unique(security_ids) if sid not in self.slots]
+        if new_ids:
+            for sid in new_ids:
+                self.slots[sid] = len(self.slots)
+            k, n_cols = len(new_ids), len(self.price_cols)
+            self.last_time = np.concatenate([self.last_time, np.full(k, np.iinfo(np.int64).min)])
+            self.pos = np.concatenate([self.pos, np.zeros(k, dtype=np.int64)])
+            self.filled = np.concatenate([self.filled, np.zeros(k, dtype=np.int64)])
+            self.buffer = np.concatenate([self.buffer, np.full((k, self.window_size, n_cols), np.nan)])
+            self.n = np.concatenate([self.n, np.zeros((k, n_cols), dtype=np.int64)])
+            self.mean = np.concatenate([self.mean, np.zeros((k, n_cols))])
+            self.m2 = np.concatenate([self.m2, np.zeros((k, n_cols))])
+            self.same = np.concatenate([self.same, np.zeros((k, n_cols), dtype=np.int64)])
+        return np.array([self.slots[sid] for sid in security_ids], dtype=np.int64)
+
+    def _step(self, s: np.ndarray, t: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """
+        Apply one snap to each of the (distinct) slots s.
+
+        Args:
+            s (np.ndarray): Slot indices, unique within the call.
+            t (np.ndarray): Snap times as int64 nanoseconds.
+            x (np.ndarray): New bid/mid/ask values, shape (len(s), 3).
+
+        Returns:
+            np.ndarray: Rolling stdev after the update, NaN until a full window.
+        """
+        window = self.window_size
+
+        # Reset securities whose previous snap is not exactly one hour back
+        reset = (t - self.last_time[s]) != self.gap.value
+        reset |= self.last_time[s] == np.iinfo(np.int64).min
+        r = s[reset]
+        self.pos[r] = 0
+        self.filled[r] = 0
+        self.n[r] = 0
+        self.mean[r] = 0.0
+        self.m2[r] = 0.0
+        self.same[r] = 0
+
+        n, mean, m2 = self.n[s], self.mean[s], self.m2[s]
+        pos = self.pos[s]
+        prev = self.buffer[s, (pos - 1) % window]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Remove the value leaving a full window
+            old = self.buffer[s, pos]
+            remove = (self.filled[s] == window)[:, None] & ~np.isnan(old)
+            n_rm = n - 1
+            mean_rm = np.where(n_rm > 0, mean - (old - mean) / n_rm, 0.0)
+            m2_rm = np.where(n_rm > 0, m2 - (old - mean) * (old - mean_rm), 0.0)
+            n = np.where(remove, n_rm, n)
+            mean = np.where(remove, mean_rm, mean)
+            m2 = np.where(remove, m2_rm, m2)
+
+            # Add the incoming value
+            add = ~np.isnan(x)
+            n_add = n + 1
+            delta = x - mean
+            mean_add = mean + delta / n_add
+            m2_add = m2 + delta * (x - mean_add)
+            n = np.where(add, n_add, n)
+            mean = np.where(add, mean_add, mean)
+            m2 = np.where(add, m2_add, m2)
+
+        same = np.where(add & (self.same[s] > 0) & (x == prev), self.same[s] + 1, add.astype(np.int64))
+        flat = same >= window
+        mean = np.where(flat, x, mean)
+        m2 = np.where(flat, 0.0, m2)
+
+        self.n[s], self.mean[s], self.m2[s], self.same[s] = n, mean, m2, same
+        self.buffer[s, pos] = x
+        self.pos[s] = (pos + 1) % window
+        self.filled[s] = np.minimum(self.filled[s] + 1, window)
+        self.last_time[s] = t
+
+        complete = n == window
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.maximum(m2, 0.0) / (window - 1))
+        return np.where(complete, std, np.nan)
+
+    def resume_range(self) -> Optional[Tuple[pd.Timestamp, None]]:
+        """
+        Snap range a run on top of this state needs to read.
+
+        Known securities only take snaps after their last processed one, so
+        older snaps can be skipped when loading. The range starts one window
+        before the earliest last snap, which also gives securities first seen
+        in this run a full window of recent history.
+
+        Returns:
+            tuple[pd.Timestamp, None] | None: Open-ended (start, None) range, or
+                None for an empty state, which needs the whole history.
+        """
+        if len(self.last_time) == 0:
+            return None
+        return pd.Timestamp(self.last_time.min()) - self.gap * self.window_size, None
+
+    def save_state(self, path: Path) -> None:
+        """
+        Persist the streaming state to an .npz file, replacing it atomically.
+
+        Args:
+            path (Path): Destination file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                window_size=np.int64(self.window_size),
+                security_ids=np.array(list(self.slots), dtype=str),
+                last_time=self.last_time,
+                pos=self.pos,
+                filled=self.filled,
+                buffer=self.buffer,
+                n=self.n,
+                mean=self.mean,
+                m2=self.m2,
+                same=self.same,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def window_from_specs(cls, specs: List[dict]) -> int:
+        """
+        Window size of rolling specs the streaming calculator can maintain.
+
+        The persisted state only covers the stdev of bid, mid and ask over a
+        single window, written to the '<col>_stdev' columns.
+
+        Args:
+            specs (list[dict]): Rolling specs from calculation_params.rolling.
+
+        Returns:
+            int: The window size.
+        """
+        expanded = cls.expand_specs(specs)
+        windows = {window for window, *_ in expanded}
+        supported = [(window, 'stdev', col, f'{col}_stdev') for window in windows for col in cls.price_cols]
+        if len(windows) != 1 or sorted(expanded) != sorted(supported):
+            raise ValueError("Streaming mode supports a single stdev spec over bid, mid and ask named '{column}_stdev'")
+        return windows.pop()
+
+    @classmethod
+    def load_state(cls, path: Path, window_size: int = 20) -> "StreamingStdevCalculator":
+        """
+        Restore a calculator from a state file, or start empty if none exists.
+
+        Args:
+            path (Path): State file written by save_state.
+            window_size (int): Expected window size.
+
+        Returns:
+            StreamingStdevCalculator: Calculator with the restored state.
+        """
+        calc = cls(window_size=window_size)
+        path = Path(path)
+        if not path.exists():
+            return calc
+
+        with np.load(path, allow_pickle=False) as state:
+            if int(state['window_size']) != window_size:
+                raise ValueError(
+                    f"State file {path} was built with window_size={int(state['window_size'])}, "
+                    f"expected {window_size}"
+                )
+            calc.slots = {sid: i for i, sid in enumerate(state['security_ids'].tolist())}
+            calc.last_time = state['last_time']
+            calc.pos = state['pos']
+            calc.filled = state['filled']
+            calc.buffer = state['buffer']
+            calc.n = state['n']
+            calc.mean = state['mean']
+            calc.m2 = state['m2']
+            calc.same = state['same']
+        return calc
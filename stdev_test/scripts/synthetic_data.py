@@ -0,0 +1,127 @@
+"""
+synthetic_data.py
+
+Generates synthetic hourly snap data for the stdev pipeline.
+
+The generated file has the same schema as stdev_price_data.parq.gzip:
+index, snap_time (timestamp), security_id, bid, mid, ask. Every security
+gets one snap per hour; a configurable share of hours is missing (breaking
+contiguous blocks) and a small share of prices is NaN. Rows are shuffled
+within each row group, like the unsorted sample data, and written in row
+groups so large files are never held in memory at once.
+
+Usage:
+    python scripts/synthetic_data.py --rows 1000000 --securities 200 --out benchmark/data
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+# Helpers shared by both projects live in <repository root>/shared
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent.parent))
+
+from shared.synthetic_data import write_row_groups
+
+class StdevDataGenerator:
+    """
+    Writes a synthetic stdev price file.
+
+    Args:
+        rows (int): Approximate number of rows; securities * hours is chosen
+            so that about this many snaps remain after gaps are removed.
+        securities (int): Number of distinct security_ids.
+        gap_frequency (float): Probability that a security has no snap in a given hour.
+        nan_frequency (float): Probability that a bid, mid or ask value is NaN.
+        start (str): Time of the first snap.
+        row_group_size (int): Approximate rows per Parquet row group.
+        seed (int): Random seed.
+    """
+
+    def __init__(self, rows: int, securities: int = 200, gap_frequency: float = 0.01,
+                 nan_frequency: float = 0.004, start: str = "2021-11-01 00:00:00",
+                 row_group_size: int = 1_000_000, seed: int = 0):
+        self.rows = rows
+        self.securities = securities
+        self.gap_frequency = gap_frequency
+        self.nan_frequency = nan_frequency
+        self.start = pd.Timestamp(start)
+        self.hours = max(1, int(np.ceil(rows / securities / (1.0 - gap_frequency))))
+        self.row_group_size = row_group_size
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def end(self) -> pd.Timestamp:
+        """Time of the last possible snap."""
+        return self.start + pd.Timedelta(hours=self.hours - 1)
+
+    def write(self, path: Path) -> int:
+        """
+        Write the file as gzip Parquet.
+
+        Args:
+            path (Path): Target file; its directory is created if missing.
+
+        Returns:
+            int: Number of rows written.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return write_row_groups(path, self._batches(), preserve_index=True)
+
+    def _batches(self) -> Iterator[pd.DataFrame]:
+        """Row groups of whole securities, truncated to rows in total."""
+        per_group = max(1, self.row_group_size // self.hours)
+        written = 0
+        for lo in range(0, self.securities, per_group):
+            df = self._securities(np.arange(lo, min(lo + per_group, self.securities)))
+            df = df.iloc[:self.rows - written]
+            df.index = pd.RangeIndex(written, written + len(df), name="index")
+            yield df
+            written += len(df)
+            if written >= self.rows:
+                break
+
+    def _securities(self, ids: np.ndarray) -> pd.DataFrame:
+        """Snaps of the given securities, with gaps and NaNs, in random order."""
+        n = len(ids) * self.hours
+        security = np.repeat(ids, self.hours)
+        hour = np.tile(np.arange(self.hours), len(ids))
+
+        # Random walk per security around a security-specific level
+        steps = self.rng.normal(0.0, 0.02, size=(len(ids), self.hours))
+        mid = (self.rng.uniform(-2.0, 2.0, size=(len(ids), 1)) + steps.cumsum(axis=1)).ravel()
+        half_spread = self.rng.uniform(0.05, 0.5, size=n)
+
+        df = pd.DataFrame({
+            "snap_time": np.datetime64(self.start, "ns") + hour.astype("timedelta64[h]"),
+            "security_id": np.char.add("id_", security.astype(str)).astype(object),
+            "bid": np.round(mid - half_spread, 3),
+            "mid": np.round(mid, 3),
+            "ask": np.round(mid + half_spread, 3),
+        })
+        for col in ["bid", "mid", "ask"]:
+            df.loc[self.rng.random(n) < self.nan_frequency, col] = np.nan
+
+        df = df[self.rng.random(n) >= self.gap_frequency]
+        return df.iloc[self.rng.permutation(len(df))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic stdev_test input data.")
+    parser.add_argument("--rows", type=int, required=True, help="Approximate number of rows.")
+    parser.add_argument("--securities", type=int, default=200, help="Number of security_ids.")
+    parser.add_argument("--gap-frequency", type=float, default=0.01, help="Share of missing hourly snaps.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=Path("benchmark/data/stdev_price_data.parq.gzip"))
+    args = parser.parse_args()
+
+    generator = StdevDataGenerator(args.rows, securities=args.securities,
+                                   gap_frequency=args.gap_frequency, seed=args.seed)
+    rows = generator.write(args.out)
+    print(f"{rows} rows from {generator.start} to {generator.end}: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+test_backend_equivalence.py
+
+Runs both pipelines on the sample data with the pandas and the polars
+backend and compares each output with the reference in the project's
+results/ directory.
+
+Each run is a separate `python scripts/main.py` process started in a
+temporary directory, with a copy of the project's config.json pointing at
+the sample data and writing its output there. Both projects import their
+modules as the `scripts` package, so they cannot share one interpreter.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Project, key of the backend setting, reference output
+PIPELINES = {
+    "rate_test": ("execution", "results/output_prices.csv"),
+    "stdev_test": ("calculation_params", "results/output_stdev.csv"),
+}
+
+def run_pipeline(project: str, backend: str, tmp_path: Path) -> pd.DataFrame:
+    """Run one project's main.py with the given backend and return its output."""
+    project_dir = REPO_ROOT / project
+    config = json.loads((project_dir / "config.json").read_text())
+
+    # Read the sample data from the project; write everything else to tmp_path
+    for cfg in config["data"].values():
+        if "path" in cfg and (project_dir / cfg["path"]).exists():
+            cfg["path"] = str(project_dir / cfg["path"])
+    config["output_file"]["path"] = str(tmp_path / "output.csv")
+    config[PIPELINES[project][0]]["backend"] = backend
+    (tmp_path / "config.json").write_text(json.dumps(config))
+
+    subprocess.run([sys.executable, str(project_dir / "scripts" / "main.py")],
+                   cwd=tmp_path, check=True, capture_output=True, text=True)
+    return pd.read_csv(tmp_path / "output.csv")
+
+@pytest.mark.parametrize("backend", ["pandas", "polars"])
+@pytest.mark.parametrize("project", sorted(PIPELINES))
+def test_backend_matches_reference(project, backend, tmp_path):
+    if backend == "polars":
+        pytest.importorskip("polars")
+    reference = pd.read_csv(REPO_ROOT / project / PIPELINES[project][1])
+
+    output = run_pipeline(project, backend, tmp_path)
+
+    # The reference stdevs came from pandas' running-sum rolling std, which
+    # drifts by up to ~1e-9 from the two-pass result on near-flat windows
+    pd.testing.assert_frame_equal(output, reference, check_exact=False, rtol=1e-9, atol=1e-8)